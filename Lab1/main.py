@@ -1,6 +1,35 @@
-from file_utils import load_data
+import argparse
 
-df = load_data()
+from file_utils import cache, load_data
+from report_utils import StreamingReport
+
+parser = argparse.ArgumentParser(description="Coffee sales dataset overview")
+parser.add_argument("--chunksize", type=int, default=None,
+                    help="stream the CSV in chunks of this many rows")
+parser.add_argument("--usecols", default=None,
+                    help="comma-separated list of columns to read")
+parser.add_argument("--auto-dtypes", action="store_true",
+                    help="sample the file and read with category/downcast dtypes")
+parser.add_argument("--extract", action="store_true",
+                    help="unpack the archive to disk instead of reading the CSV from the ZIP")
+parser.add_argument("--no-cache", action="store_true",
+                    help="always re-parse the CSV instead of using the frame cache")
+parser.add_argument("--approximate", action="store_true",
+                    help="use sketches for unique/top/quantile/duplicate counts (bounded memory for large files)")
+args = parser.parse_args()
+
+usecols = args.usecols.split(",") if args.usecols else None
+dtype = "auto" if args.auto_dtypes else None
+
+if args.chunksize:
+    report = StreamingReport(approximate=args.approximate)
+    for chunk in load_data(chunksize=args.chunksize, usecols=usecols, dtype=dtype, extract=args.extract):
+        report.update(chunk)
+    report.print()
+    raise SystemExit
+
+df = load_data(usecols=usecols, dtype=dtype, extract=args.extract, use_cache=not args.no_cache)
+cache.report()
 
 print("First rows:\n")
 print(df.head())
@@ -8,15 +37,7 @@ print(df.head())
 print("Structural information:\n")
 print(df.info())
 
-print("Descriptive statistics:\n")
-print(df.describe(include="all"))
-
-print("Missing values:\n")
-print(df.isnull().sum())
-
-print("Duplicate rows:\n")
-print("Number of duplicates:", df.duplicated().sum())
-
-print("Sorting by money:\n")
-sorted_df = df.sort_values(by="money", ascending=False)
-print(sorted_df.head(10))
+# describe, nulls, duplicates (row hashes) and the top rows by money (nlargest) in one pass
+report = StreamingReport(approximate=args.approximate)
+report.update(df)
+report.print_stats()
@@ -0,0 +1,273 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.dtype_planner import DistinctSketch  # noqa: E402
+
+# Above this many distinct values per column the exact value counts are
+# dropped to keep memory bounded: numeric columns lose the quantiles of the
+# streamed describe() (a frame passed in one chunk still gets them, from
+# Series.quantile), text columns switch to the approximate-mode sketches
+MAX_DISTINCT = 100_000
+# Approximate mode: counters kept per column for the top value, and values
+# kept per numeric column for the quantiles
+TOP_CAPACITY = 1_000
+SAMPLE_SIZE = 100_000
+# Approximate mode: distinct row hashes kept for the duplicate estimate
+ROW_SAMPLE = 1_000_000
+
+
+class StreamingReport:
+    """Accumulates the Lab1 reports chunk by chunk.
+
+    Produces the same tables as head(), describe(include="all"),
+    isnull().sum(), duplicated().sum() and sort_values("money").head(n)
+    while holding per-column value counts, the current top rows and one
+    8-byte hash per distinct row in memory. The row hashes are kept in
+    sorted runs of geometrically growing size, so each chunk costs a binary
+    search per run instead of re-sorting everything seen so far. Value
+    counts stop at MAX_DISTINCT per column (see there). A whole DataFrame
+    can be passed as a single chunk, which replaces the separate passes of
+    those calls with one.
+
+    With `approximate` the memory no longer grows with the number of
+    distinct values: unique counts come from KMV sketches, duplicates from
+    the row hashes below a threshold that is halved whenever more than
+    ROW_SAMPLE distinct hashes are kept (identical rows are always sampled
+    together; the count is scaled back up), top/freq from a Misra-Gries
+    summary of TOP_CAPACITY counters (freq is a lower bound, off by at most
+    rows / TOP_CAPACITY) and numeric quantiles from a uniform sample of
+    SAMPLE_SIZE values. Nulls, moments, min/max and the top rows stay exact.
+    """
+
+    def __init__(self, sort_col="money", top_n=10, head_n=5, approximate=False):
+        self.sort_col = sort_col
+        self.top_n = top_n
+        self.head_n = head_n
+        self.approximate = approximate
+        self.rows = 0
+        self.updates = 0
+        self.head = None
+        self.top = None
+        self.dtypes = None
+        self.nulls = None
+        self.value_counts = {}
+        self.moments = {}
+        self.capped = set()
+        self.quantiles = {}
+        self.hash_runs = []
+        self.row_hashes = np.empty(0, dtype="uint64")
+        self.duplicates = 0
+        self.row_counts = np.empty(0, dtype="int64")
+        self.row_fraction = 1.0
+        self.sketches = {}
+        self.samples = {}
+        self._rng = np.random.default_rng(0)
+
+    def update(self, chunk):
+        if self.head is None:
+            self.head = chunk.head(self.head_n)
+            self.dtypes = chunk.dtypes
+        self.rows += len(chunk)
+        self.updates += 1
+        if self.updates == 2:
+            # Computed from the first chunk alone, no longer the whole data
+            self.quantiles = {}
+
+        nulls = chunk.isnull().sum()
+        self.nulls = nulls if self.nulls is None else self.nulls.add(nulls, fill_value=0)
+
+        for col in chunk.columns:
+            s = chunk[col]
+            numeric = pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+            if self.approximate or (col in self.capped and not numeric):
+                self._update_sketches(col, s, numeric)
+            elif col not in self.capped:
+                self._update_counts(col, s, numeric)
+            if numeric:
+                self._update_moments(col, s.dropna().to_numpy(dtype="float64"))
+
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        if self.approximate:
+            self._update_row_sample(hashes)
+        else:
+            uniq, counts = np.unique(hashes, return_counts=True)
+            self.duplicates += int((counts - 1).sum())
+            seen = self._seen(uniq)
+            self.duplicates += int(seen.sum())
+            self._add_run(uniq[~seen])
+
+        if self.sort_col in chunk.columns:
+            best = chunk.nlargest(self.top_n, self.sort_col)
+            if self.top is not None:
+                best = pd.concat([self.top, best]).nlargest(self.top_n, self.sort_col)
+            self.top = best
+
+    def _seen(self, hashes):
+        found = np.zeros(hashes.size, dtype=bool)
+        for run in self.hash_runs:
+            idx = np.minimum(np.searchsorted(run, hashes), run.size - 1)
+            found |= run[idx] == hashes
+        return found
+
+    def _add_run(self, hashes):
+        if not hashes.size:
+            return
+        self.hash_runs.append(hashes)
+        # Merge while the newer run is at least half the size of the one before,
+        # so there are O(log rows) runs and each hash is merged O(log rows) times
+        while len(self.hash_runs) > 1 and 2 * self.hash_runs[-1].size >= self.hash_runs[-2].size:
+            newer = self.hash_runs.pop()
+            # Both halves are sorted; the stable sort (timsort) merges them in linear time
+            self.hash_runs[-1] = np.sort(np.concatenate([self.hash_runs[-1], newer]), kind="stable")
+
+    def _update_counts(self, col, s, numeric):
+        vc = s.value_counts(dropna=True)
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # Categories differ between chunks, so merge on the plain values
+            vc = vc[vc > 0]
+            vc.index = vc.index.astype(s.cat.categories.dtype)
+        counts = self.value_counts.get(col)
+        counts = vc if counts is None else counts.add(vc, fill_value=0)
+        if len(counts) > MAX_DISTINCT:
+            self.capped.add(col)
+            if numeric:
+                counts = None
+                if self.updates == 1:
+                    self.quantiles[col] = dict(zip(("25%", "50%", "75%"), s.quantile([0.25, 0.5, 0.75])))
+            else:
+                # Continue with the approximate-mode unique sketch and top/freq summary
+                self.sketches[col] = DistinctSketch()
+                self.sketches[col].update(counts.index)
+                counts = _trim_counts(counts)
+        self.value_counts[col] = counts
+
+    def _update_row_sample(self, hashes):
+        if self.row_fraction < 1.0:
+            hashes = hashes[hashes < np.uint64(self.row_fraction * 2.0 ** 64)]
+        merged, inverse = np.unique(np.concatenate([self.row_hashes, hashes]), return_inverse=True)
+        weights = np.concatenate([self.row_counts, np.ones(hashes.size, dtype="int64")])
+        counts = np.bincount(inverse.ravel(), weights=weights, minlength=merged.size).astype("int64")
+        while merged.size > ROW_SAMPLE:
+            self.row_fraction /= 2
+            keep = merged < np.uint64(self.row_fraction * 2.0 ** 64)
+            merged, counts = merged[keep], counts[keep]
+        self.row_hashes, self.row_counts = merged, counts
+        self.duplicates = int(round((counts - 1).sum() / self.row_fraction))
+
+    def _update_sketches(self, col, s, numeric):
+        self.sketches.setdefault(col, DistinctSketch()).update(s)
+        if numeric:
+            # Bottom-k sampling: every value gets a random key and the smallest keys are kept
+            values = s.dropna().to_numpy(dtype="float64")
+            keys = self._rng.random(values.size)
+            old_keys, old_values = self.samples.get(col, (np.empty(0), np.empty(0)))
+            keys, values = np.concatenate([old_keys, keys]), np.concatenate([old_values, values])
+            if keys.size > SAMPLE_SIZE:
+                keep = np.argpartition(keys, SAMPLE_SIZE - 1)[:SAMPLE_SIZE]
+                keys, values = keys[keep], values[keep]
+            self.samples[col] = (keys, values)
+            return
+        vc = s.value_counts(dropna=True)
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            vc = vc[vc > 0]
+            vc.index = vc.index.astype(s.cat.categories.dtype)
+        counts = self.value_counts.get(col)
+        counts = vc if counts is None else counts.add(vc, fill_value=0)
+        self.value_counts[col] = _trim_counts(counts)
+
+    def _update_moments(self, col, values):
+        m = self.moments.setdefault(col, {"count": 0, "sum": 0.0, "sumsq": 0.0, "min": np.inf, "max": -np.inf})
+        if values.size == 0:
+            return
+        m["count"] += values.size
+        m["sum"] += values.sum()
+        m["sumsq"] += np.square(values).sum()
+        m["min"] = min(m["min"], values.min())
+        m["max"] = max(m["max"], values.max())
+
+    def describe(self):
+        """describe(include="all") rebuilt from the accumulated counters."""
+        out = {}
+        for col in self.dtypes.index:
+            counts = self.value_counts.get(col)
+            if col in self.moments:
+                m = self.moments[col]
+                n = m["count"]
+                mean = m["sum"] / n if n else np.nan
+                var = (m["sumsq"] - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+                stats = {"count": n, "mean": mean, "std": np.sqrt(max(var, 0.0)) if n > 1 else np.nan,
+                         "min": m["min"] if n else np.nan}
+                if self.approximate:
+                    sample = self.samples.get(col, (None, np.empty(0)))[1]
+                    if sample.size:
+                        stats.update(zip(("25%", "50%", "75%"), np.quantile(sample, [0.25, 0.5, 0.75])))
+                else:
+                    stats.update(self.quantiles.get(col) or _quantiles(counts))
+                stats["max"] = m["max"] if n else np.nan
+            else:
+                if col in self.sketches:
+                    stats = {"count": self.rows - int(self.nulls[col]), "unique": self.sketches[col].estimate()[0]}
+                else:
+                    stats = {"count": int(counts.sum()), "unique": len(counts)}
+                if len(counts):
+                    stats["top"] = counts.idxmax()
+                    stats["freq"] = int(counts.max())
+            out[col] = stats
+        order = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+        table = pd.DataFrame(out)
+        return table.reindex([r for r in order if r in table.index])
+
+    def print(self):
+        print("First rows:\n")
+        print(self.head)
+
+        print("Structural information:\n")
+        print(f"Rows: {self.rows}")
+        print(self.dtypes)
+
+        self.print_stats()
+
+    def print_stats(self):
+        """The tables after head/info: describe, nulls, duplicates and the top rows."""
+        approx = " (approximate)" if self.approximate else ""
+        print(f"Descriptive statistics{approx}:\n")
+        print(self.describe())
+
+        print("Missing values:\n")
+        print(self.nulls.astype("int64"))
+
+        print(f"Duplicate rows{approx}:\n")
+        print("Number of duplicates:", self.duplicates)
+
+        print(f"Sorting by {self.sort_col}:\n")
+        print(self.top)
+
+
+def _trim_counts(counts):
+    # Mergeable Misra-Gries summary: after a merge, subtract the (capacity+1)-th
+    # largest count from all counters and drop those that reach zero
+    if len(counts) > TOP_CAPACITY:
+        cut = counts.nlargest(TOP_CAPACITY + 1).iloc[-1]
+        counts = counts[counts > cut] - cut
+    return counts
+
+
+def _quantiles(counts):
+    if counts is None or counts.empty:
+        return {}
+    counts = counts.sort_index()
+    cum = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype="float64")
+    n = cum[-1]
+    out = {}
+    for q, label in ((0.25, "25%"), (0.5, "50%"), (0.75, "75%")):
+        # Linear interpolation between order statistics, as in Series.quantile
+        pos = q * (n - 1)
+        lo = values[np.searchsorted(cum, np.floor(pos), side="right")]
+        hi = values[np.searchsorted(cum, np.ceil(pos), side="right")]
+        out[label] = lo + (hi - lo) * (pos - np.floor(pos))
+    return out
@@ -0,0 +1,189 @@
+"""Headless batch mode for the COVID_19 survey tasks.
+
+    python batch.py COVID_19.xlsx [more.xlsx ...] [--tasks 3,4,5,7,8,9] [--workers 4] [--threads 4]
+                    [--out-dir batch_out] [--pages]
+
+Runs the menu tasks of main.py without input(). The requested tasks (plus
+the ones they require) run in the full-pipeline order; consecutive
+read-only tasks form a wave that runs concurrently on threads sharing the
+same frame, everything that modifies the frame runs alone. Each task's
+output is captured separately and written, in task order, to
+<out-dir>/<file name>/output.txt (with --pages also histograms.pdf).
+Several input files are processed in a pool of worker processes.
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# No display in batch mode; must be set before matplotlib is imported by main
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import pandas as pd  # noqa: E402
+
+import main  # noqa: E402
+
+# Full-pipeline order; task 2 goes after the readers because set_index changes the index they print
+ORDER = ['1', '3', '4', '5', '6', '7', '8', '9', '2', '10']
+# Tasks added automatically when a task that needs them is requested
+REQUIRES = {'5': ['4']}
+# Tasks that change the shared frame
+MUTATES = {'2', '3', '4', '5'}
+# Read-only, but matplotlib is not thread-safe, so never run next to another task
+EXCLUSIVE = {'10'}
+
+
+def plan(task_ids):
+    """Split the tasks into waves; tasks in one wave can run concurrently."""
+    unknown = [t for t in task_ids if t not in ORDER]
+    if unknown:
+        raise ValueError(f"Unknown tasks {unknown}, expected some of {ORDER}")
+    selected = set()
+    pending = list(task_ids)
+    while pending:
+        t = pending.pop()
+        if t not in selected:
+            selected.add(t)
+            pending.extend(REQUIRES.get(t, []))
+    waves, readers = [], []
+    for t in ORDER:
+        if t not in selected:
+            continue
+        if t in MUTATES or t in EXCLUSIVE:
+            if readers:
+                waves.append(readers)
+                readers = []
+            waves.append([t])
+        else:
+            readers.append(t)
+    if readers:
+        waves.append(readers)
+    return waves
+
+
+class _ThreadStdout(io.TextIOBase):
+    """sys.stdout replacement that sends each thread's prints to its own buffer."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self.local, 'buf', None)
+        return (buf or self.fallback).write(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+
+def _run_task(task_id, out):
+    buf = io.StringIO()
+    out.local.buf = buf
+    start = time.perf_counter()
+    error = None
+    try:
+        main.actions[task_id]()
+    except Exception as e:
+        error = repr(e)
+        buf.write(traceback.format_exc())
+    finally:
+        out.local.buf = None
+    return task_id, buf.getvalue(), time.perf_counter() - start, error
+
+
+def run_file(path, waves, out_dir, threads=None, pages=False):
+    """Run the planned task waves on one input file; returns a summary dict."""
+    path = os.path.abspath(path)
+    target = os.path.join(os.path.abspath(out_dir), os.path.splitext(os.path.basename(path))[0])
+    os.makedirs(target, exist_ok=True)
+    start = time.perf_counter()
+    try:
+        df = main.cache.load(path, lambda: pd.read_excel(path), tag='read_excel')
+    except Exception as e:
+        # One unreadable file should not stop the others in the pool
+        return {'file': path, 'out': target, 'rows': None, 'load_s': time.perf_counter() - start,
+                'total_s': time.perf_counter() - start, 'tasks': [], 'error': repr(e)}
+    load_secs = time.perf_counter() - start
+    main.dataset.set(df)
+
+    out = _ThreadStdout(sys.stdout)
+    saved, sys.stdout = sys.stdout, out
+    cwd = os.getcwd()
+    # Task 10 saves its figure to the working directory
+    os.chdir(target)
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for wave in waves:
+                if len(wave) == 1:
+                    results.append(_run_task(wave[0], out))
+                else:
+                    results.extend(pool.map(lambda t: _run_task(t, out), wave))
+        if pages:
+            # Only --pages needs matplotlib; importing it for every run would slow down the workers' start
+            from plot_utils import render_pages
+            # Temperature histograms for every boolean/categorical column, one PDF page each
+            cols = df.select_dtypes(include=['boolean', 'category']).columns
+            render_pages('histograms.pdf', df, 'Maximum body temperature', cols)
+    finally:
+        os.chdir(cwd)
+        sys.stdout = saved
+        main.dataset.set(None)
+
+    with open(os.path.join(target, 'output.txt'), 'w', encoding='utf-8') as f:
+        for task_id, text, secs, error in results:
+            f.write(f"===== Завдання {task_id} ({secs:.3f} с) =====\n{text}\n")
+    return {'file': path, 'out': target, 'rows': len(df), 'load_s': load_secs,
+            'total_s': time.perf_counter() - start,
+            'tasks': [(task_id, secs, error) for task_id, _, secs, error in results]}
+
+
+def _run_file_job(job):
+    return run_file(*job)
+
+
+def run_batch(files, waves, out_dir, workers=None, threads=None, pages=False):
+    jobs = [(f, waves, out_dir, threads, pages) for f in files]
+    if workers == 1 or len(jobs) <= 1:
+        return [run_file(*j) for j in jobs]
+    # fork shares the already imported modules with the workers
+    ctx = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(_run_file_job, jobs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run COVID_19 survey tasks without the menu")
+    parser.add_argument("files", nargs="*", default=[main.DATA_FILE], help="survey .xlsx files")
+    parser.add_argument("--tasks", default=",".join(t for t in ORDER if t != '1'),
+                        help=f"comma-separated task numbers from {ORDER} (default: the full pipeline)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for several files (1 = sequential)")
+    parser.add_argument("--threads", type=int, default=None, help="threads for concurrent read-only tasks")
+    parser.add_argument("--out-dir", default="batch_out", help="directory for the per-file outputs")
+    parser.add_argument("--pages", action="store_true",
+                        help="also write histograms.pdf with a temperature histogram page per boolean/category column")
+    args = parser.parse_args()
+
+    try:
+        waves = plan([t.strip() for t in args.tasks.split(",") if t.strip()])
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print("План виконання:", " -> ".join("[" + ", ".join(w) + "]" for w in waves))
+
+    failed = False
+    for r in run_batch(args.files, waves, args.out_dir, args.workers, args.threads, args.pages):
+        if r.get('error'):
+            print(f"\n{r['file']}: помилка завантаження: {r['error']}")
+            failed = True
+            continue
+        print(f"\n{r['file']}: {r['rows']} рядків, завантаження {r['load_s']:.3f} с, усього {r['total_s']:.3f} с -> {r['out']}")
+        for task_id, secs, error in r['tasks']:
+            status = f"помилка: {error}" if error else "ok"
+            print(f"  {task_id:>2}: {secs:.3f} с, {status}")
+            failed |= error is not None
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+YES_NO_MAP = {
+    'yes': True, 'y': True, 'так': True, 'true': True, '1': True, '1.0': True,
+    'no': False, 'n': False, 'ні': False, 'false': False, '0': False, '0.0': False,
+}
+
+# Outcome classes counted per column
+_TRUE, _FALSE, _MAYBE, _UNKNOWN, _MISSING = range(5)
+
+
+def _normalize_key(value):
+    return str(value).strip().lower()
+
+
+def normalize_bool(series, mapping=YES_NO_MAP, maybe=()):
+    """Map a Yes/No-like column to the nullable 'boolean' dtype.
+
+    The column is factorized and only its distinct values are normalized
+    (str/strip/lower) and looked up, then the per-value results are
+    broadcast back through the codes. Values in `maybe` and anything not in
+    `mapping` become NA. Returns (BooleanArray, counts dict).
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    maybe = {_normalize_key(v) for v in maybe}
+
+    n = len(uniques)
+    # One extra trailing slot for code -1 (missing)
+    values = np.zeros(n + 1, dtype=bool)
+    mask = np.ones(n + 1, dtype=bool)
+    kind = np.full(n + 1, _MISSING, dtype=np.int8)
+    for i, v in enumerate(uniques):
+        key = _normalize_key(v)
+        if key in mapping:
+            values[i] = mapping[key]
+            mask[i] = False
+            kind[i] = _TRUE if mapping[key] else _FALSE
+        elif key in maybe or key.startswith('maybe'):
+            kind[i] = _MAYBE
+        else:
+            kind[i] = _UNKNOWN
+
+    result = pd.arrays.BooleanArray(values.take(codes), mask.take(codes))
+    counts = np.bincount(kind.take(codes), minlength=5)
+    unknown = [v for i, v in enumerate(uniques) if kind[i] == _UNKNOWN]
+    return result, {
+        'true': int(counts[_TRUE]), 'false': int(counts[_FALSE]),
+        'maybe': int(counts[_MAYBE]), 'unknown': int(counts[_UNKNOWN]),
+        'missing': int(counts[_MISSING]), 'unknown_values': unknown,
+    }
+
+
+def normalize_bool_columns(df, columns, mapping=YES_NO_MAP, maybe=()):
+    """Normalize every present column of `df` in place; returns per-column counts."""
+    report = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        df[col], report[col] = normalize_bool(df[col], mapping, maybe)
+    return report
@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+class LazyDataset:
+    """Loads a DataFrame on first use and keeps it for later calls.
+
+    `loader` is called at most once; concurrent get() calls (e.g. from a
+    prefetch thread and a task) wait for the same load. Tasks mutate the
+    returned frame in place, so every caller sees the same object.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._df = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self._df is not None
+
+    def get(self):
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    start = time.perf_counter()
+                    self._df = self._loader()
+                    print(f"Дані завантажено з файлу {self.name} за {time.perf_counter() - start:.3f} с")
+        return self._df
+
+    def set(self, df):
+        """Replace the current frame, e.g. with an already loaded one."""
+        with self._lock:
+            self._df = df
+
+    def prefetch(self):
+        """Start loading in a background thread if nothing is loaded yet."""
+        if self._df is None and self._thread is None:
+            self._thread = threading.Thread(target=self._prefetch, name=f"prefetch-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _prefetch(self):
+        try:
+            self.get()
+        except Exception as e:
+            # The next task calls get() again and reports the error itself
+            print("Не вдалося завантажити дані у фоні:", repr(e))
@@ -0,0 +1,59 @@
+import numpy as np
+
+STRATEGIES = ('median', 'mean', 'mode')
+
+
+def _group_mode(grouped, col):
+    # value_counts sorts by count within each group, so the first row is the mode
+    counts = grouped[col].value_counts(sort=True)
+    # Categorical columns list every category, unseen ones with a count of 0
+    counts = counts[counts > 0]
+    keys = list(range(counts.index.nlevels - 1))
+    mode = counts.groupby(level=keys, sort=True).head(1).reset_index(level=-1).iloc[:, 0]
+    # Groups with no values at all are absent from value_counts
+    return mode.reindex(grouped.size().index)
+
+
+def _overall(series, strategy):
+    if strategy == 'mode':
+        mode = series.mode(dropna=True)
+        return mode.iloc[0] if not mode.empty else np.nan
+    return getattr(series, strategy)()
+
+
+def impute(df, col, by=None, strategy='median'):
+    """Fill missing values of df[col] in place.
+
+    Group statistics for the `by` key(s) are computed once with the built-in
+    groupby reduction and broadcast back to the rows through the group
+    numbers (no per-group Python callback). Rows still missing afterwards
+    (e.g. with a missing key) get the statistic of the whole column.
+    Returns the counts and the statistics used, so callers can report them
+    without recomputing.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+    if isinstance(by, str):
+        by = [by]
+    by = [k for k in (by or []) if k in df.columns]
+
+    result = {'strategy': strategy, 'by': by, 'missing_before': int(df[col].isna().sum()),
+              'group_stats': None}
+    if by:
+        grouped = df.groupby(by, observed=True, sort=True, dropna=True)
+        if strategy == 'mode':
+            stats = _group_mode(grouped, col)
+        else:
+            stats = grouped[col].agg(strategy)
+        codes = grouped.ngroup().fillna(-1).astype(np.int64).to_numpy()
+        # Positional lookup keeps the statistics' dtype (modes of text columns
+        # included); code -1 (missing key) is not a position and gives NA
+        fill = stats.reset_index(drop=True).reindex(codes).set_axis(df.index)
+        df[col] = df[col].fillna(fill)
+        result['group_stats'] = stats
+    result['missing_after_group'] = int(df[col].isna().sum())
+
+    result['overall'] = _overall(df[col], strategy)
+    df[col] = df[col].fillna(result['overall'])
+    result['missing_after'] = int(df[col].isna().sum())
+    return result
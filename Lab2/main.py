@@ -1,16 +1,47 @@
+import argparse
+import os
+import sys
+import time
+
+_start = time.perf_counter()
+
 import pandas as pd
 import matplotlib
-import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.frame_cache import FrameCache  # noqa: E402
+from dataset import LazyDataset  # noqa: E402
+from common.dtype_planner import format_memory, optimize  # noqa: E402
+from bool_utils import normalize_bool_columns  # noqa: E402
+from date_utils import date_parts, parse_dates  # noqa: E402
+from impute_utils import impute  # noqa: E402
+from profiling_utils import StageProfiler  # noqa: E402
 
 DATA_FILE = 'COVID_19.xlsx'
-df = pd.read_excel(DATA_FILE)
+cache = FrameCache()
+
+
+def load_dataset():
+    df = cache.load(DATA_FILE, lambda: pd.read_excel(DATA_FILE), tag='read_excel')
+    cache.report()
+    return df
+
+
+# Read on first use, so importing a task or printing the menu stays cheap
+dataset = LazyDataset(DATA_FILE, load_dataset)
+
+# Per-task timing/memory records; off unless main.py is started with --profile
+profiler = StageProfiler(frame=dataset.get)
+stage = profiler.stage
 
 MAYBE_VARIANTS = [
     'Maybe', 'Maybe ', 'Maybe (можливо)', 'Maybe (можливо) ', 'Maybe (можливо)(можливо)',
     'maybe', 'maybe ', 'maybe (можливо)'
 ]
 
+@stage
 def task_inspect_head_info():
+    df = dataset.get()
     print("=== Перші 5 рядків датасету ===")
     print(df.head())
     print("\n=== Інформація по колонках ===")
@@ -21,38 +52,32 @@ def task_inspect_head_info():
     print("\n=== Описова статистика (числові) ===")
     print(df.describe())
 
+@stage
 def task_parse_dates():
+    df = dataset.get()
     print("2) Друге завдання — розпарсити колонку 'Date time' та створити індекс 'parsed_date'.\n")
-    def parse_date(x):
-        return pd.to_datetime(x, dayfirst=True, errors='coerce')
-
     date_col = "Date time"
     if date_col not in df.columns:
         print("Колонку 'Date time' не знайдено.")
         return
 
-    df.loc[:, 'parsed_date'] = df[date_col].apply(parse_date)
-    df.loc[:, 'year'] = df['parsed_date'].dt.year
-    df.loc[:, 'month'] = df['parsed_date'].dt.month
-    df.loc[:, 'day'] = df['parsed_date'].dt.day
-    df.loc[:, 'hour'] = df['parsed_date'].dt.hour
-    df.loc[:, 'weekday'] = df['parsed_date'].dt.day_name()
-    df.set_index('parsed_date', inplace=True)
+    parsed, info = parse_dates(df[date_col], dayfirst=True)
+    print(f"Унікальних значень: {info['distinct']}, формат: {info['format']}, "
+          f"розпарсено поелементно: {info['fallback']}")
+    parts = date_parts(parsed)
+    df[list(parts.columns)] = parts
+    df.set_index(pd.DatetimeIndex(parsed, name='parsed_date'), inplace=True)
     print("Парсинг дат завершено. 'parsed_date' встановлено як індекс. Додані колонки: year, month, day, hour, weekday.")
 
+@stage
 def task_handle_missing_and_map_bool():
+    df = dataset.get()
     print("3) Третє завдання — обробка пропущених значень та мапінг Yes/No -> булеві (де можливо).\n")
     before = len(df)
     df.dropna(how='all', inplace=True)
     after = len(df)
     print(f"Видалено повністю порожніх рядків: {before - after}. Залишилось рядків: {after}")
 
-    yes_no_map = {
-        'yes': True, 'y': True, 'так': True, 'true': True, '1': True,
-        'no': False, 'n': False, 'ні': False, 'false': False, '0': False,
-        True: True, False: False, 1: True, 0: False
-    }
-
     cols_to_bool_candidates = [
         'Do you smoke?',
         "Have you had Covid'19 this year?",
@@ -62,38 +87,33 @@ def task_handle_missing_and_map_bool():
         'Have you had tuberculosis this year?'
     ]
 
-    for col in cols_to_bool_candidates:
-        if col not in df.columns:
-            continue
-        s = df[col].astype(str).str.strip()
-        mapped = s.str.lower().map(yes_no_map)
-        # Присвоїмо mapped туди, де маємо значення, інакше залишимо оригінал
-        df.loc[:, col] = mapped.combine_first(df[col])
-        # Тепер гарантовано замінимо 'Maybe' варіанти на NA
-        df.loc[:, col] = df[col].replace(MAYBE_VARIANTS + [v.lower() for v in MAYBE_VARIANTS], pd.NA)
-        # Якщо після цього в колонці тільки True/False (без NA) — зробимо category
-        non_na = df[col].dropna()
-        if not non_na.empty and set(non_na.unique()).issubset({True, False}):
-            df.loc[:, col] = df[col].astype('category')
-        print(f"Колонка '{col}' оброблена. Приклади значень: {df[col].dropna().unique()[:10]}")
+    # Yes/No -> True/False, Maybe і нерозпізнані значення -> NA (тип 'boolean')
+    report = normalize_bool_columns(df, cols_to_bool_candidates, maybe=MAYBE_VARIANTS)
+    for col, r in report.items():
+        print(f"Колонка '{col}' оброблена: True={r['true']}, False={r['false']}, "
+              f"NA (Maybe)={r['maybe']}, NA (пропуски)={r['missing']}, NA (нерозпізнані)={r['unknown']}")
+        if r['unknown_values']:
+            print(f"  Нерозпізнані значення: {r['unknown_values'][:10]}")
 
+@stage
 def task_convert_types_to_category():
+    df = dataset.get()
     print("4) Четверте завдання — перетворення деяких колонок у категоріальні типи.\n")
-    cat_candidates = ['Gender', 'Region', 'Blood group']
-    
-    for c in cat_candidates:
-        if c not in df.columns:
-            print(f"Колонка '{c}' відсутня в датафреймі.")
-            continue
-        
-        # Simple and clean conversion using astype
-        df[c] = df[c].astype('category')
-        print(f"Колонка '{c}' конвертована в категоріальний тип.")
-        
-        # Show unique categories for this column
-        print(f"Унікальні категорії: {df[c].cat.categories.tolist()}")
+    # One profiling pass over all columns: repeated text -> category, integers -> smallest int type.
+    # Floats are left as they are, whole-valued ones included: task 5 fills them with medians,
+    # and the statistics printed by tasks 5 and 8 do not change
+    report = optimize(df, floats=False, whole_floats=False)
+    for c, (old, new) in report['changes'].items():
+        if new == 'category':
+            print(f"Колонка '{c}' конвертована в категоріальний тип.")
+            # Show unique categories for this column
+            print(f"Унікальні категорії: {df[c].cat.categories.tolist()}")
+        else:
+            print(f"Колонка '{c}' конвертована: {old} -> {new}")
         print()
-    
+    print(f"Пам'ять датафрейму: {format_memory(report)}")
+    print()
+
     print("Поточні типи колонок:")
     print(df.dtypes)
     print()
@@ -106,7 +126,9 @@ def task_convert_types_to_category():
 
 
 
+@stage
 def task_impute_temperature():
+    df = dataset.get()
     print("5) П'яте завдання — імпутація 'Maximum body temperature'.\n")
     temp_col = 'Maximum body temperature'
     
@@ -117,35 +139,20 @@ def task_impute_temperature():
     # Convert to numeric type
     df[temp_col] = pd.to_numeric(df[temp_col], errors='coerce')
     
-    # Count missing values before imputation
-    missing_before = int(df[temp_col].isna().sum())
-    print(f"Відсутніх значень ДО імпутації: {missing_before}")
-    
-    # Group-based imputation if Gender column exists
-    if 'Gender' in df.columns:
-        # Use observed=True to silence the warning and handle only observed categories
-        df[temp_col] = df.groupby('Gender', observed=True)[temp_col].transform(
-            lambda s: s.fillna(s.median())
-        )
-        
-        missing_after_group = int(df[temp_col].isna().sum())
-        print(f"Відсутніх після імпутації медіаною по Gender: {missing_after_group}")
-        
-        # Show median temperatures by gender for transparency
-        gender_medians = df.groupby('Gender', observed=True)[temp_col].median()
+    # Group medians are computed once and reused for the report below
+    result = impute(df, temp_col, by=['Gender'], strategy='median')
+    print(f"Відсутніх значень ДО імпутації: {result['missing_before']}")
+
+    if result['group_stats'] is not None:
+        print(f"Відсутніх після імпутації медіаною по Gender: {result['missing_after_group']}")
         print("Медіанні температури по статі:")
-        for gender, median_temp in gender_medians.items():
+        for gender, median_temp in result['group_stats'].items():
             print(f"  {gender}: {median_temp:.2f}")
     else:
         print("Колонка 'Gender' відсутня — пропускаємо групову імпутацію.")
-        missing_after_group = missing_before
-    
-    # Overall imputation for remaining missing values
-    overall_median = float(df[temp_col].median())
-    df[temp_col] = df[temp_col].fillna(overall_median)
-    
-    missing_after_all = int(df[temp_col].isna().sum())
-    print(f"Відсутніх після загальної імпутації: {missing_after_all}. Використана медіана = {overall_median:.2f}")
+
+    print(f"Відсутніх після загальної імпутації: {result['missing_after']}. "
+          f"Використана медіана = {result['overall']:.2f}")
     
     # Additional statistics
     print(f"\nСтатистика після імпутації:")
@@ -154,11 +161,15 @@ def task_impute_temperature():
     print(f"Середня температура: {df[temp_col].mean():.2f}")
     print(f"Стандартне відхилення: {df[temp_col].std():.2f}")
 
+@stage
 def task_descriptive_stats():
+    df = dataset.get()
     print("6) Шосте завдання — описова статистика (include='all'):\n")
     print(df.describe(include='all'))
 
+@stage
 def task_sort_variant1():
+    df = dataset.get()
     print("7) Сьоме завдання — сортування: Age (зростання), Do you smoke? (спадання)\n")
     sort_cols = []
     if 'Age' in df.columns:
@@ -180,19 +191,28 @@ def task_sort_variant1():
     print(f"Перші 10 рядків після сортування по {sort_cols} (ascending={ascending}):")
     print(df_sorted.head(10))
 
+@stage
 def task_mean_igg_unvaccinated():
+    df = dataset.get()
     print("8) Восьме завдання — середнє IgG level для невакцинованих від грипу.\n")
     igG_col = 'IgG level'
     vacc_flu_col = 'Do you vaccinated influenza?'
     if igG_col not in df.columns or vacc_flu_col not in df.columns:
         print("Відсутні необхідні колонки для обчислення.")
         return
-    condition = (df[vacc_flu_col] == False) | (df[vacc_flu_col] == 'No') | (df[vacc_flu_col] == 0)
+    vacc = df[vacc_flu_col]
+    if vacc.dtype == 'boolean':
+        # After task 3: NA (Maybe) is not "unvaccinated"
+        condition = vacc.eq(False).fillna(False)
+    else:
+        condition = (vacc == False) | (vacc == 'No') | (vacc == 0)
     subset = df[condition]
     mean_igg_unvaccinated = pd.to_numeric(subset[igG_col], errors='coerce').mean()
     print(f"Середнє IgG level для невакцинованих від грипу: {mean_igg_unvaccinated}")
 
+@stage
 def task_frequency_do_you_smoke():
+    df = dataset.get()
     print("9) Дев'яте завдання — частоти для 'Do you smoke?'\n")
     col = 'Do you smoke?'
     if col not in df.columns:
@@ -201,50 +221,56 @@ def task_frequency_do_you_smoke():
     counts = df[col].value_counts(dropna=False)
     print(f"Частота значень у '{col}':\n{counts}")
 
+@stage
 def task_visualizations():
+    df = dataset.get()
     print("10) Десяте завдання — візуалізації (гістограми температури по категоріях).\n")
     temp_col = 'Maximum body temperature'
-    plt.figure(figsize=(12, 5))
-
-    # a)
-    plt.subplot(1, 2, 1)
-    if 'Do you smoke?' in df.columns and temp_col in df.columns:
-        for name, group in df.groupby('Do you smoke?'):
-            plt.hist(group[temp_col].dropna(), bins=15, alpha=0.6, label=str(name))
-        plt.title('Розподіл максимальної температури тіла за "Чи курите?"')
-        plt.xlabel('Максимальна температура тіла')
-        plt.ylabel('Кількість')
-        plt.legend(title='Чи курите?')
-    else:
-        plt.text(0.5, 0.5, "Відсутні колонки для першого графіка", ha='center')
-        plt.axis('off')
-
-    # b)
-    plt.subplot(1, 2, 2)
-    if 'Have you had influenza this year?' in df.columns and temp_col in df.columns:
-        for name, group in df.groupby('Have you had influenza this year?'):
-            plt.hist(group[temp_col].dropna(), bins=15, alpha=0.6, label=str(name))
-        plt.title('Розподіл максимальної температури тіла за "Чи була грип цього року?"')
-        plt.xlabel('Максимальна температура тіла')
-        plt.ylabel('Кількість')
-        plt.legend(title='Грип цього року?')
-    else:
-        plt.text(0.5, 0.5, "Відсутні колонки для другого графіка", ha='center')
-        plt.axis('off')
-
-    plt.tight_layout()
+    panels = [
+        ('Do you smoke?', 'Розподіл максимальної температури тіла за "Чи курите?"', 'Чи курите?',
+         "Відсутні колонки для першого графіка"),
+        ('Have you had influenza this year?', 'Розподіл максимальної температури тіла за "Чи була грип цього року?"',
+         'Грип цього року?', "Відсутні колонки для другого графіка"),
+    ]
 
     backend = matplotlib.get_backend().lower()
     if 'agg' in backend:
+        # No window to show: bin all groups at once and draw without pyplot.
+        # Imported here, as it loads the matplotlib backends and would slow down the menu start
+        from plot_utils import render_panels
         fname = 'temperature_histograms.png'
-        plt.savefig(fname)
+        render_panels(fname, [
+            {'values': df[temp_col], 'groups': df[col], 'title': title, 'xlabel': 'Максимальна температура тіла',
+             'ylabel': 'Кількість', 'legend_title': legend}
+            if col in df.columns and temp_col in df.columns else {'message': missing}
+            for col, title, legend, missing in panels
+        ])
         print(f"Середовище без інтерактивного вікна — збережено графік у файл: {fname}")
-    else:
-        plt.show()
-        print("Графік показано у вікні.")
+        return
+
+    # pyplot is imported here: it is the slowest import and only this path needs it
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(12, 5))
+    for i, (col, title, legend, missing) in enumerate(panels, start=1):
+        plt.subplot(1, 2, i)
+        if col in df.columns and temp_col in df.columns:
+            for name, group in df.groupby(col):
+                plt.hist(group[temp_col].dropna(), bins=15, alpha=0.6, label=str(name))
+            plt.title(title)
+            plt.xlabel('Максимальна температура тіла')
+            plt.ylabel('Кількість')
+            plt.legend(title=legend)
+        else:
+            plt.text(0.5, 0.5, missing, ha='center')
+            plt.axis('off')
+
+    plt.tight_layout()
+    plt.show()
+    print("Графік показано у вікні.")
 
 def task_full_pipeline():
     print("Запуск повного pipeline (3 -> 4 -> 5 -> 6 -> 7 -> 8 -> 9 -> 2 -> 10)\n")
+    mark = profiler.mark()
     task_handle_missing_and_map_bool()
     task_convert_types_to_category()
     task_impute_temperature()
@@ -253,10 +279,25 @@ def task_full_pipeline():
     task_mean_igg_unvaccinated()
     task_frequency_do_you_smoke()
     # parse dates останнім, бо set_index змінює індекс
-    if "Date time" in df.columns:
+    if "Date time" in dataset.get().columns:
         task_parse_dates()
     task_visualizations()
     print("Pipeline завершено.")
+    if profiler.enabled:
+        print_profile(since=mark)
+
+
+def print_profile(since=0):
+    table = profiler.summary(since)
+    if table.empty:
+        return
+    print("\n=== Профіль етапів ===")
+    print(table.to_string(index=False, float_format='{:.3f}'.format))
+    for r in profiler.records[since:]:
+        if r['dtype_changes']:
+            print(f"{r['stage']}: зміни типів: {', '.join(r['dtype_changes'])}")
+    if profiler.dump_dir:
+        print(f"cProfile/tracemalloc звіти по етапах збережено у {profiler.dump_dir}")
 
 
 def print_menu():
@@ -264,7 +305,7 @@ def print_menu():
     print("1  - Показати head/info/describe")
     print("2  - Розпарсити дату ('Date time') і зробити індекс ('parsed_date')")
     print("3  - Видалити повністю порожні рядки та замапити Yes/No -> bool")
-    print("4  - Перетворити текстові поля у категоріальні (Gender, Region, Blood group)")
+    print("4  - Перетворити колонки у компактні типи (категорії для текстових полів, менші цілі типи)")
     print("5  - Імпутація 'Maximum body temperature' (by Gender + overall)")
     print("6  - Описова статистика (include='all')")
     print("7  - Сортування (Age ASC, Do you smoke? DESC)")
@@ -289,7 +330,9 @@ actions = {
 }
 
 def main_menu_loop():
-    print(f"Дані прочитані з файлу: {DATA_FILE}")
+    # Parse the file while the user is reading the menu
+    dataset.prefetch()
+    print(f"Меню готове за {(time.perf_counter() - _start) * 1000:.1f} мс, дані з файлу {DATA_FILE} завантажуються у фоні")
     while True:
         print_menu()
         choice = input("Ваш вибір: ").strip()
@@ -300,10 +343,25 @@ def main_menu_loop():
         if action is None:
             print("Невірний вибір. Спробуйте ще.")
             continue
+        mark = profiler.mark()
         try:
             action()
         except Exception as e:
             print("Під час виконання сталася помилка:", repr(e))
+        # The full pipeline prints its own table
+        if profiler.enabled and action is not task_full_pipeline:
+            print_profile(since=mark)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="COVID_19 survey tasks")
+    parser.add_argument("--profile", action="store_true",
+                        help="record time, memory, rows and dtype changes of every task")
+    parser.add_argument("--profile-dir", default=None,
+                        help="also write cProfile and tracemalloc reports per task to this directory")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="with --profile, skip memory tracing (it slows the tasks down)")
+    args = parser.parse_args()
+    profiler.enabled = args.profile or bool(args.profile_dir)
+    profiler.dump_dir = args.profile_dir
+    profiler.trace_memory = not args.no_tracemalloc
     main_menu_loop()
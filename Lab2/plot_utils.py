@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+
+def grouped_histograms(values, groups, bins=15):
+    """Histogram counts of `values` for every group of `groups` in one pass.
+
+    All groups share the bin edges of the whole column, so bars of
+    different groups line up. Rows with a missing value or group are
+    skipped, as df.groupby(col)[value].dropna() would. Returns
+    (labels, counts of shape (groups, bins), edges).
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+    try:
+        codes, labels = pd.factorize(groups, sort=True, use_na_sentinel=True)
+    except TypeError:
+        # Mixed types (e.g. True and 'Yes') cannot be sorted
+        codes, labels = pd.factorize(groups, use_na_sentinel=True)
+    keep = (codes >= 0) & np.isfinite(values)
+    edges = np.histogram_bin_edges(values[keep], bins=bins)
+    # Same rule as np.histogram: right edge of the last bin is inclusive
+    idx = np.clip(np.searchsorted(edges, values[keep], side='right') - 1, 0, len(edges) - 2)
+    counts = np.bincount(codes[keep] * (len(edges) - 1) + idx, minlength=len(labels) * (len(edges) - 1))
+    return list(labels), counts.reshape(len(labels), len(edges) - 1), edges
+
+
+def draw_histograms(ax, labels, counts, edges, title, xlabel, ylabel, legend_title):
+    for label, row in zip(labels, counts):
+        ax.stairs(row, edges, fill=True, alpha=0.6, label=str(label))
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.legend(title=legend_title)
+
+
+def _figure(figsize):
+    # A Figure with its own canvas is not registered with pyplot, so nothing
+    # keeps it alive once the caller drops it
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _close(fig):
+    fig.clear()
+    fig.canvas = None
+
+
+def render_panels(path, panels, figsize=(12, 5), bins=15):
+    """Draw side-by-side histogram panels into one image file.
+
+    `panels` is a list of dicts with 'values', 'groups' and the
+    draw_histograms() labels, or with 'message' for an empty panel.
+    """
+    fig = _figure(figsize)
+    try:
+        axes = fig.subplots(1, len(panels), squeeze=False)[0]
+        for ax, panel in zip(axes, panels):
+            if 'message' in panel:
+                ax.text(0.5, 0.5, panel['message'], ha='center')
+                ax.axis('off')
+                continue
+            labels, counts, edges = grouped_histograms(panel['values'], panel['groups'], bins)
+            draw_histograms(ax, labels, counts, edges, panel['title'], panel['xlabel'], panel['ylabel'],
+                            panel['legend_title'])
+        fig.tight_layout()
+        fig.savefig(path)
+    finally:
+        _close(fig)
+
+
+def render_pages(path, df, value_col, by_cols, bins=15, figsize=(8, 5)):
+    """One page per column of `by_cols` with the histograms of `value_col`, in one PDF."""
+    pages = 0
+    with PdfPages(path) as pdf:
+        for col in by_cols:
+            if col not in df.columns:
+                continue
+            fig = _figure(figsize)
+            try:
+                labels, counts, edges = grouped_histograms(df[value_col], df[col], bins)
+                draw_histograms(fig.add_subplot(), labels, counts, edges, f"{value_col} за '{col}'",
+                                value_col, 'Кількість', col)
+                fig.tight_layout()
+                pdf.savefig(fig)
+                pages += 1
+            finally:
+                _close(fig)
+    return pages
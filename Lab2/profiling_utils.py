@@ -0,0 +1,117 @@
+import cProfile
+import functools
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+def _dtype_changes(before, after):
+    changes = []
+    for col in before.index.union(after.index, sort=False):
+        old, new = before.get(col), after.get(col)
+        if old is None:
+            changes.append(f"+{col}: {new}")
+        elif new is None:
+            changes.append(f"-{col}")
+        elif old != new:
+            changes.append(f"{col}: {old} -> {new}")
+    return changes
+
+
+class StageProfiler:
+    """Registry of pipeline stages that can record what each stage costs.
+
+    Functions decorated with stage() are registered by name and, while the
+    profiler is enabled, every call records wall and CPU time, the traced
+    memory peak and net delta (tracemalloc), the rows of the shared frame
+    before and after, and the columns whose dtype changed. With `dump_dir`
+    each call also writes a cProfile stats file and the top tracemalloc
+    allocation sites. When disabled the wrapper only calls the function.
+    """
+
+    def __init__(self, frame=None, enabled=False, dump_dir=None, trace_memory=True):
+        self.frame = frame
+        self.enabled = enabled
+        self.dump_dir = dump_dir
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.records = []
+
+    def stage(self, fn):
+        name = fn.__name__[5:] if fn.__name__.startswith('task_') else fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            return self._run(name, fn, args, kwargs)
+
+        self.stages[name] = wrapper
+        return wrapper
+
+    def _snapshot(self):
+        # Taken before the clock starts, so loading the frame is not charged to the stage
+        df = self.frame() if self.frame else None
+        return (None, None) if df is None else (len(df), df.dtypes.astype(str))
+
+    def _run(self, name, fn, args, kwargs):
+        rows_in, dtypes_in = self._snapshot()
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        profile = cProfile.Profile() if self.dump_dir else None
+
+        record = {'stage': name}
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            if profile:
+                return profile.runcall(fn, *args, **kwargs)
+            return fn(*args, **kwargs)
+        except Exception as e:
+            record['error'] = repr(e)
+            raise
+        finally:
+            record['wall_s'] = time.perf_counter() - wall
+            record['cpu_s'] = time.process_time() - cpu
+            snapshot = None
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record['peak_mib'] = (peak - mem_start) / 2 ** 20
+                record['delta_mib'] = (current - mem_start) / 2 ** 20
+                if self.dump_dir:
+                    snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+            rows_out, dtypes_out = self._snapshot()
+            record['rows_in'], record['rows_out'] = rows_in, rows_out
+            record['dtype_changes'] = _dtype_changes(dtypes_in, dtypes_out) if dtypes_in is not None else []
+            if self.dump_dir:
+                self._dump(len(self.records), name, profile, snapshot)
+            self.records.append(record)
+
+    def _dump(self, index, name, profile, snapshot):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        base = os.path.join(self.dump_dir, f"{index:02d}_{name}")
+        profile.dump_stats(base + '.prof')
+        if snapshot is not None:
+            top = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).statistics('lineno')[:25]
+            with open(base + '.tracemalloc.txt', 'w', encoding='utf-8') as f:
+                f.write("\n".join(str(s) for s in top) + "\n")
+
+    def mark(self):
+        """Position in the records, for summarising only what runs after it."""
+        return len(self.records)
+
+    def summary(self, since=0):
+        records = self.records[since:]
+        table = pd.DataFrame(records, columns=['stage', 'wall_s', 'cpu_s', 'peak_mib', 'delta_mib',
+                                               'rows_in', 'rows_out', 'dtype_changes'])
+        table['dtype_changes'] = table['dtype_changes'].map(len)
+        total = table['wall_s'].sum()
+        table['share'] = (table['wall_s'] / total).map('{:.0%}'.format) if total else ''
+        return table
@@ -0,0 +1,74 @@
+import numpy as np, pandas as pd
+
+
+def _codes(s):
+    """Integer codes (0 = missing) and labels of a column, without sorting it."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, labels = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, labels = pd.factorize(s, use_na_sentinel=True)
+    return codes.astype(np.int64) + 1, labels
+
+
+class CategoryAggregator:
+    """Row counts and sums of one value column for several categorical keys.
+
+    Every key is reduced with np.bincount over its integer codes (category
+    codes when the column is categorical, factorize codes otherwise), and
+    the value column is converted once per update. update() can be called
+    per chunk; results are merged by label. Missing keys are counted under
+    a NaN label, like value_counts(dropna=False); missing values add 0 to
+    the sums, like groupby().sum().
+    """
+
+    def __init__(self, keys, value_col):
+        self.keys = list(keys)
+        self.value_col = value_col
+        self.rows = 0
+        self._labels = {}
+        self._counts = {}
+        self._sums = {}
+        self._categorical = {}
+
+    def update(self, df):
+        self.rows += len(df)
+        values = df[self.value_col].to_numpy(dtype="float64", na_value=np.nan)
+        values = np.where(np.isnan(values), 0.0, values)
+        for k in self.keys:
+            if k not in df.columns: continue
+            codes, labels = _codes(df[k])
+            self._categorical[k] = isinstance(df[k].dtype, pd.CategoricalDtype)
+            n = len(labels) + 1
+            counts = np.bincount(codes, minlength=n)
+            sums = np.bincount(codes, weights=values, minlength=n)
+            labels = pd.Index([np.nan]).append(pd.Index(labels, dtype=object))
+            self._merge(k, labels, counts, sums)
+
+    def _merge(self, k, labels, counts, sums):
+        if k not in self._labels:
+            self._labels[k], self._counts[k], self._sums[k] = labels, counts, sums
+        elif self._labels[k].equals(labels):
+            self._counts[k] = self._counts[k] + counts
+            self._sums[k] = self._sums[k] + sums
+        else:
+            c = pd.Series(self._counts[k], index=self._labels[k]).add(pd.Series(counts, index=labels), fill_value=0)
+            s = pd.Series(self._sums[k], index=self._labels[k]).add(pd.Series(sums, index=labels), fill_value=0)
+            self._labels[k], self._counts[k], self._sums[k] = c.index, c.to_numpy(np.int64), s.reindex(c.index).to_numpy()
+
+    def counts(self, k, dropna=False):
+        """value_counts(dropna=dropna) of key k, most frequent first."""
+        s = pd.Series(self._counts[k], index=self._labels[k].rename(k), name="count")
+        s = s[s > 0] if not self._categorical[k] else s[s.index.notna() | (s > 0)]
+        if dropna: s = s[s.index.notna()]
+        return s.sort_values(ascending=False, kind="stable")
+
+    def sums(self, k):
+        """groupby(k)[value_col].sum() in label order (missing key excluded)."""
+        s = pd.Series(self._sums[k], index=self._labels[k].rename(k), name=self.value_col)
+        if not self._categorical[k]: s = s[pd.Series(self._counts[k], index=s.index) > 0]
+        return s[s.index.notna()]
+
+    def top(self, k, n=8, of="sums"):
+        """n largest groups by sum (or count), without sorting the rest."""
+        s = self.sums(k) if of == "sums" else self.counts(k)
+        return s.nlargest(n)
@@ -0,0 +1,85 @@
+import numpy as np, pandas as pd
+from scipy import stats
+
+
+class NormalityCache:
+    """Normality-test p-values per series name, computed once.
+
+    Uses Shapiro-Wilk up to 5000 points and D'Agostino's normaltest above,
+    as step [7] does; a failing test is cached as NaN.
+    """
+
+    def __init__(self):
+        self.p = {}
+
+    def __call__(self, name, values):
+        if name not in self.p:
+            try:
+                values = np.asarray(values, dtype="float64")
+                self.p[name] = stats.shapiro(values)[1] if len(values) <= 5000 else stats.normaltest(values)[1]
+            except Exception:
+                self.p[name] = np.nan
+        return self.p[name]
+
+
+def _pearson(X):
+    # Column-standardize once, then one matrix product gives all pairs
+    X = X - X.mean(axis=0)
+    norm = np.sqrt((X * X).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        Z = X / norm
+        R = Z.T @ Z
+    np.clip(R, -1.0, 1.0, out=R)
+    return R
+
+
+def _p_values(R, n):
+    # Two-sided t-test of r with n-2 dof (what pearsonr/spearmanr report)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = R * np.sqrt((n - 2) / (1.0 - R * R))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+    p[np.abs(R) == 1.0] = 0.0
+    return p
+
+
+def correlation_matrices(frame, normality=None, alpha=0.05):
+    """Pearson and Spearman matrices with p-values for all column pairs.
+
+    `frame` must have no missing values (pivot_clean or a slice of it).
+    Ranks are computed once for the whole frame. Returns a dict of
+    DataFrames ('pearson', 'pearson_p', 'spearman', 'spearman_p',
+    'use_pearson') plus the per-column normality p-values ('normal_p').
+    """
+    cols = list(frame.columns)
+    X = frame.to_numpy(dtype="float64")
+    n = X.shape[0]
+    normality = normality or NormalityCache()
+
+    out = {}
+    for name, values in (("pearson", X), ("spearman", stats.rankdata(X, axis=0))):
+        R = _pearson(values)
+        out[name] = pd.DataFrame(R, index=cols, columns=cols)
+        out[name + "_p"] = pd.DataFrame(_p_values(R, n), index=cols, columns=cols)
+
+    normal_p = pd.Series([normality(c, frame[c]) for c in cols], index=cols, dtype="float64")
+    normal = (normal_p > alpha).to_numpy()
+    out["normal_p"] = normal_p
+    out["use_pearson"] = pd.DataFrame(np.logical_and.outer(normal, normal), index=cols, columns=cols)
+    return out
+
+
+def top_pairs(result, k=10):
+    """Strongest off-diagonal pairs, using Pearson where both columns look normal."""
+    cols = result["pearson"].columns
+    use_p = result["use_pearson"].to_numpy()
+    r = np.where(use_p, result["pearson"].to_numpy(), result["spearman"].to_numpy())
+    p = np.where(use_p, result["pearson_p"].to_numpy(), result["spearman_p"].to_numpy())
+    i, j = np.triu_indices(len(cols), k=1)
+    strength = np.abs(r[i, j])
+    strength = np.where(np.isnan(strength), -1, strength)
+    order = np.argsort(-strength, kind="stable")[:k]
+    return pd.DataFrame({
+        "a": cols[i[order]], "b": cols[j[order]],
+        "method": np.where(use_p[i[order], j[order]], "Pearson", "Spearman"),
+        "r": r[i[order], j[order]], "p": p[i[order], j[order]],
+    })
@@ -0,0 +1,69 @@
+from difflib import get_close_matches
+
+# Common alternative spellings -> OWID location names (keys are case-folded)
+ALIASES = {
+    "usa": "United States", "us": "United States", "u.s.": "United States", "u.s.a.": "United States",
+    "united states of america": "United States", "america": "United States",
+    "uk": "United Kingdom", "great britain": "United Kingdom", "britain": "United Kingdom",
+    "korea": "South Korea", "republic of korea": "South Korea", "korea, south": "South Korea",
+    "dprk": "North Korea", "korea, north": "North Korea",
+    "czech republic": "Czechia", "russian federation": "Russia",
+    "uae": "United Arab Emirates", "drc": "Democratic Republic of Congo",
+    "holland": "Netherlands", "the netherlands": "Netherlands",
+    "ivory coast": "Cote d'Ivoire", "burma": "Myanmar", "persia": "Iran",
+    "macedonia": "North Macedonia", "swaziland": "Eswatini", "turkiye": "Turkey",
+    "bosnia": "Bosnia and Herzegovina", "vatican": "Vatican", "hongkong": "Hong Kong",
+}
+
+
+class CountryResolver:
+    """Maps user-supplied country names to the names present in the data.
+
+    Lookup order: exact name, case-folded name, alias or ISO code, then a
+    difflib fuzzy match. Everything but the fuzzy step is a dict lookup and
+    fuzzy results (including misses) are memoized per input string.
+    """
+
+    def __init__(self, names, iso_codes=None, aliases=ALIASES, cutoff=0.7):
+        self.names = list(names)
+        self.cutoff = cutoff
+        self._exact = set(self.names)
+        self._folded = {}
+        for n in self.names:
+            self._folded.setdefault(n.casefold(), n)
+        self._alias = {}
+        for code, n in (iso_codes or {}).items():
+            if isinstance(code, str) and n in self._exact:
+                self._alias.setdefault(code.casefold(), n)
+        for alias, n in aliases.items():
+            if n in self._exact:
+                self._alias.setdefault(alias.casefold(), n)
+        self._fuzzy = {}
+
+    @classmethod
+    def from_frame(cls, df, country_col, names=None, iso_col="iso_code", **kw):
+        """Build from the data, taking ISO codes from `iso_col` when present."""
+        if names is None:
+            names = df[country_col].dropna().unique()
+        iso = None
+        if iso_col in df.columns and iso_col != country_col:
+            pairs = df[[iso_col, country_col]].dropna().drop_duplicates(iso_col)
+            iso = dict(zip(pairs[iso_col].astype(str), pairs[country_col].astype(str)))
+        return cls(names, iso_codes=iso, **kw)
+
+    def resolve(self, name):
+        if name in self._exact: return name
+        key = name.casefold().strip()
+        found = self._folded.get(key) or self._alias.get(key)
+        if found: return found
+        if name not in self._fuzzy:
+            m = get_close_matches(name, self.names, n=1, cutoff=self.cutoff)
+            self._fuzzy[name] = m[0] if m else None
+        return self._fuzzy[name]
+
+    def resolve_many(self, names):
+        """Resolve a batch; each distinct input is looked up once."""
+        done = {}
+        for n in names:
+            if n not in done: done[n] = self.resolve(n)
+        return [done[n] for n in names]
@@ -0,0 +1,83 @@
+import multiprocessing, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np, pandas as pd
+
+try:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    hw=True
+except Exception:
+    hw=False
+
+
+def naive_forecast(series, steps):
+    return pd.Series([series.iloc[-1]]*steps, index=pd.date_range(series.index[-1]+pd.Timedelta(days=1), periods=steps))
+
+
+def group_series(group_sum, present):
+    """Daily series of a group's summed cases, gaps forward-filled (step [8])."""
+    return group_sum(present).asfreq("D", fill_value=np.nan).ffill().fillna(0)
+
+
+def forecast_one(job):
+    """Fit additive-trend Holt-Winters for one (name, series, steps) job.
+
+    Falls back to repeating the last value when statsmodels is missing,
+    the history is too short or the fit fails. Returns
+    (name, forecast, method, seconds, state) where `state` holds what
+    roll_state() needs to extend the fit with new observations.
+    """
+    name, series, steps = job
+    start = time.perf_counter()
+    method = "naive"
+    state = {"alpha": 1.0, "beta": 0.0, "level": float(series.iloc[-1]), "trend": 0.0}
+    if hw and series.dropna().shape[0] > 5:
+        try:
+            fit = ExponentialSmoothing(series, trend="add", seasonal=None, initialization_method="estimated").fit()
+            f = fit.forecast(steps); method = "HoltWinters"
+            state = {"alpha": float(fit.params["smoothing_level"]), "beta": float(fit.params["smoothing_trend"]),
+                     "level": float(fit.level.iloc[-1]), "trend": float(fit.trend.iloc[-1]),
+                     "initial_level": float(fit.params["initial_level"]),
+                     "initial_trend": float(fit.params["initial_trend"])}
+        except Exception:
+            f = naive_forecast(series, steps)
+    else:
+        f = naive_forecast(series, steps)
+    state.update(method=method, start=series.index[0], last_date=series.index[-1])
+    return name, f, method, time.perf_counter()-start, state
+
+
+def roll_state(state, new):
+    """Advance a saved Holt state over observations dated after state["last_date"].
+
+    Applies the additive Holt recursions with the fitted smoothing
+    parameters, which is what statsmodels does inside the fit.
+    """
+    a, b = state["alpha"], state["beta"]
+    level, trend = state["level"], state["trend"]
+    for y in new.to_numpy(dtype="float64"):
+        prev = level
+        level = a*y + (1-a)*(level+trend)
+        trend = b*(level-prev) + (1-b)*trend
+    out = dict(state, level=level, trend=trend)
+    if len(new): out["last_date"] = new.index[-1]
+    return out
+
+
+def state_forecast(state, steps):
+    idx = pd.date_range(state["last_date"]+pd.Timedelta(days=1), periods=steps)
+    return pd.Series(state["level"] + state["trend"]*np.arange(1, steps+1), index=idx)
+
+
+def run_forecasts(series_by_name, steps=14, workers=None):
+    """Forecast every series, in input order, on a pool of `workers` processes.
+
+    Only the per-group series are sent to the workers. workers=1, and
+    platforms without fork, run in this process without a pool.
+    """
+    jobs = [(name, s, steps) for name, s in series_by_name.items()]
+    # spawn would re-run the calling script (Lab3/main.py has no __main__ guard) in every worker
+    if workers == 1 or len(jobs) <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [forecast_one(j) for j in jobs]
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(forecast_one, jobs))
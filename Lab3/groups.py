@@ -0,0 +1,19 @@
+# Country groups for step [8] (list from assignment)
+groups = {
+ "scandinavia":["Sweden","Norway","Denmark","Finland"],
+ "benelux":["Belgium","Netherlands","Luxembourg"],
+ "eu4":["Poland","Hungary","Czechia","Slovakia"],
+ "arabian":["Saudi Arabia","Yemen","Oman","United Arab Emirates"],
+ "asia_rok_hk_sg_tw":["South Korea","Hong Kong","Singapore","Taiwan"],
+ "mong_china_viet":["Mongolia","China","Vietnam"],
+ "north_africa_4":["Morocco","Algeria","Tunisia","Libya"],
+ "south_africa_4":["South Africa","Namibia","Botswana","Lesotho"],
+ "india_nepal_pk":["India","Nepal","Pakistan"],
+ "south_america_4":["Brazil","Argentina","Colombia","Chile"],
+ "baltic_4":["Estonia","Latvia","Lithuania","Lithuania"], # adjust if needed
+ "balkan_4":["Slovenia","Croatia","Serbia","Bosnia and Herzegovina"],
+ "pol_hun_cze_svk":["Poland","Hungary","Czechia","Slovakia"],
+ "svn_hrv_ltu_lva":["Slovenia","Croatia","Lithuania","Latvia"],
+ "bul_rom_ukr_alb":["Bulgaria","Romania","Ukraine","Albania"],
+ "nafta":["Canada","United States","Mexico"]
+}
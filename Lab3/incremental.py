@@ -0,0 +1,181 @@
+"""Incremental daily refresh of the OWID pipeline.
+
+    python incremental.py [owid-covid-data.csv] [--state owid_state.pkl] [--verify]
+
+Keeps the (country, date) panel, the category counts/sums of steps [3]-[4]
+and the fitted group forecasts of step [8] in a state file. Each run reads
+only the needed columns, ingests rows dated after the last date already
+seen for their location, updates the aggregates in place and rolls the
+saved Holt states forward instead of refitting. Rows without a valid date
+are ignored in both the incremental and the full computation.
+"""
+import argparse, os, sys, time
+import numpy as np, pandas as pd
+
+from country_resolver import CountryResolver
+from forecast_utils import forecast_one, group_series, hw, roll_state, run_forecasts, state_forecast
+from groups import groups
+from long_format import LongPanel
+from owid_io import DATE_COLS
+
+COUNT_KEYS = ("continent","test_units","tests_units")
+CATEGORY_KEYS = ("iso_code","continent","location","tests_units")
+STEPS = 14
+
+
+def read_rows(fn):
+    header = pd.read_csv(fn, nrows=0).columns
+    date_col = next((c for c in DATE_COLS if c in header), "date")
+    country_col = next((c for c in ("location","country","iso_code") if c in header), "location")
+    cases_col = "total_cases" if "total_cases" in header else ("new_cases" if "new_cases" in header else None)
+    if not cases_col: raise SystemExit("No total_cases/new_cases in dataset")
+    keys = [c for c in dict.fromkeys(COUNT_KEYS + CATEGORY_KEYS) if c in header]
+    usecols = list(dict.fromkeys([date_col, country_col, cases_col] + keys))
+    df = pd.read_csv(fn, usecols=usecols)
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    df[cases_col] = pd.to_numeric(df[cases_col], errors="coerce")
+    cols = {"date": date_col, "country": country_col, "cases": cases_col,
+            "counts": [k for k in COUNT_KEYS if k in header], "sums": [k for k in CATEGORY_KEYS if k in header]}
+    return df[df[date_col].notna()], cols
+
+
+def empty_state(cols):
+    return {"cols": cols, "last_seen": pd.Series(dtype="datetime64[ns]"),
+            "last_seen_missing": pd.NaT, "obs": None,
+            "counts": {}, "sums": {}, "models": {}}
+
+
+def _add(a, b):
+    return b if a is None else a.add(b, fill_value=0)
+
+
+def ingest(state, df):
+    """Fold rows newer than last_seen into the state; returns the new rows."""
+    c = state["cols"]
+    missing = df[c["country"]].isna()
+    last = df[c["country"]].map(state["last_seen"])
+    # Rows without a country have their own last_seen date, otherwise they would count as new on every run
+    last = last.mask(missing, state.get("last_seen_missing", pd.NaT))
+    new = df[last.isna() | (df[c["date"]] > last)]
+    if new.empty: return new
+
+    obs = new.groupby([c["country"], c["date"]], sort=False)[c["cases"]].sum()
+    merged = obs if state["obs"] is None else pd.concat([state["obs"], obs])
+    # A (country, date) pair can only come from one side, so concat + sort is enough
+    state["obs"] = merged.sort_index()
+    for k in c["counts"]:
+        state["counts"][k] = _add(state["counts"].get(k), new[k].value_counts(dropna=False))
+    for k in c["sums"]:
+        state["sums"][k] = _add(state["sums"].get(k), new.groupby(k)[c["cases"]].sum())
+    seen = new.groupby(c["country"])[c["date"]].max()
+    state["last_seen"] = pd.concat([state["last_seen"], seen]).groupby(level=0).max()
+    if missing[new.index].any():
+        state["last_seen_missing"] = pd.Series([state.get("last_seen_missing", pd.NaT),
+                                                new.loc[missing[new.index], c["date"]].max()]).max()
+    return new
+
+
+def refresh_forecasts(state, workers=None):
+    """Roll each group's saved Holt state forward, refitting only when needed.
+
+    A group is refit when it is new, its resolved members changed, its
+    history up to the saved last date no longer matches (late rows), or it
+    only had a naive forecast so far.
+    """
+    panel = LongPanel(state["obs"])
+    resolver = CountryResolver(panel.countries)
+    refit, report = {}, {}
+    for g, lst in groups.items():
+        present = [m for m in resolver.resolve_many(lst) if m]
+        if not present:
+            state["models"].pop(g, None); continue
+        series = group_series(panel.group_sum, present)
+        model = state["models"].get(g)
+        if (model is None or model["present"] != present or (hw and model["method"] != "HoltWinters")
+                or not model["history"].equals(series[:model["last_date"]])):
+            refit[g] = series; continue
+        new = series[series.index > model["last_date"]]
+        state["models"][g] = dict(roll_state(model, new), history=series)
+        report[g] = f"rolled +{len(new)}d"
+    for name, f, method, secs, st in run_forecasts(refit, steps=STEPS, workers=workers):
+        state["models"][name] = dict(st, present=[m for m in resolver.resolve_many(groups[name]) if m],
+                                     history=refit[name])
+        report[name] = f"refit ({method}, {secs:.3f}s)"
+    return report
+
+
+def full_state(df, cols):
+    state = empty_state(cols)
+    ingest(state, df)
+    return state
+
+
+def _same(a, b):
+    if not a.index.equals(b.index): return False
+    if pd.api.types.is_datetime64_any_dtype(a): return a.equals(b)
+    return np.allclose(a.to_numpy(dtype="float64"), b.to_numpy(dtype="float64"), equal_nan=True)
+
+
+def verify(state, df):
+    """Compare the incremental state with a full recompute from `df`."""
+    full = full_state(df, state["cols"])
+    ok = True
+    checks = [("panel", state["obs"], full["obs"]), ("last_seen", state["last_seen"].sort_index(), full["last_seen"].sort_index())]
+    checks += [(f"counts[{k}]", state["counts"][k], full["counts"][k]) for k in full["counts"]]
+    checks += [(f"sums[{k}]", state["sums"][k], full["sums"][k]) for k in full["sums"]]
+    for name, a, b in checks:
+        same = _same(a.sort_index(), b.sort_index())
+        ok &= same
+        print(f" {name}: {'match' if same else 'MISMATCH'}")
+
+    # Forecasts: the rolled state must equal a fixed-parameter fit on the full series
+    panel = LongPanel(full["obs"])
+    for g, m in state["models"].items():
+        series = group_series(panel.group_sum, m["present"])
+        mine = state_forecast(m, STEPS)
+        if m["method"] == "HoltWinters":
+            from statsmodels.tsa.holtwinters import ExponentialSmoothing
+            ref = ExponentialSmoothing(series[m["start"]:], trend="add", seasonal=None, initialization_method="known",
+                                       initial_level=m["initial_level"], initial_trend=m["initial_trend"]
+                                       ).fit(smoothing_level=m["alpha"], smoothing_trend=m["beta"], optimized=False).forecast(STEPS)
+        else:
+            ref = pd.Series([series.iloc[-1]]*STEPS, index=mine.index)
+        same = _same(ref, mine)
+        drift = np.abs(forecast_one((g, series, STEPS))[1].to_numpy() - mine.to_numpy()).max()
+        ok &= same
+        print(f" forecast {g}: {'match' if same else 'MISMATCH'} (vs re-estimated fit: max diff {drift:,.2f})")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental OWID refresh")
+    parser.add_argument("fn", nargs="?", default="owid-covid-data.csv")
+    parser.add_argument("--state", default="owid_state.pkl", help="state file (created on first run)")
+    parser.add_argument("--verify", action="store_true", help="compare with a full recompute")
+    parser.add_argument("--workers", type=int, default=None, help="processes for refits")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df, cols = read_rows(args.fn)
+    if os.path.exists(args.state):
+        state = pd.read_pickle(args.state)
+        if state["cols"] != cols: raise SystemExit(f"{args.state} was built for columns {state['cols']}")
+    else:
+        print(f"No state at {args.state}, building from scratch")
+        state = empty_state(cols)
+    new = ingest(state, df)
+    print(f"Read {len(df)} rows, ingested {len(new)} new rows in {time.perf_counter()-start:.2f}s")
+    if state["obs"] is None: raise SystemExit("No rows with a valid date")
+
+    start = time.perf_counter()
+    report = refresh_forecasts(state, args.workers)
+    print(f"Forecasts refreshed in {time.perf_counter()-start:.2f}s")
+    for g, m in state["models"].items():
+        f = state_forecast(m, STEPS)
+        print(f" {g}: {report[g]} -> next 5: {list(map(float, f.iloc[:5]))}")
+    pd.to_pickle(state, args.state)
+    print("State saved to", args.state)
+
+    if args.verify:
+        print("\nVerifying against a full recompute:")
+        if not verify(state, df): sys.exit(1)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+
+class LongPanel:
+    """Sparse alternative to pivot_table(index=date, columns=country).
+
+    Keeps one value per observed (country, date) pair in a Series sorted by
+    that MultiIndex, so memory grows with the number of observations rather
+    than with days x countries. Per-country series, group sums and wide
+    slices for a few countries are derived on demand and return the same
+    values the dense pivot would (sum aggregation, NaN-only cells as 0).
+
+    `fill_value` is what an unobserved (country, date) cell reads as. With a
+    categorical country column pivot_table(observed=False) materializes
+    every combination as 0, so from_frame uses 0 there and NaN otherwise.
+    """
+
+    def __init__(self, obs, countries=None, fill_value=np.nan):
+        self.obs = obs
+        self.fill_value = fill_value
+        self.country_level, self.date_level = obs.index.names
+        # Distinct, sorted dates of the whole panel (the dense pivot's index)
+        self.dates = pd.DatetimeIndex(np.unique(obs.index.get_level_values(1)), name=self.date_level)
+        if countries is None:
+            countries = obs.index.get_level_values(0).unique()
+        self.countries = list(countries)
+        self._complete = None
+
+    @classmethod
+    def from_frame(cls, df, country_col, date_col, value_col):
+        obs = df.groupby([country_col, date_col], observed=True, sort=True)[value_col].sum()
+        if isinstance(df[country_col].dtype, pd.CategoricalDtype):
+            return cls(obs, countries=df[country_col].cat.categories, fill_value=0.0)
+        return cls(obs)
+
+    @property
+    def shape(self):
+        """Shape of the equivalent dense pivot (dates, countries)."""
+        return len(self.dates), len(self.countries)
+
+    def memory_report(self):
+        dense = self.shape[0] * self.shape[1] * 8
+        return self.obs.memory_usage(deep=True), dense
+
+    def series(self, country):
+        return self.obs.xs(country, level=0)
+
+    def complete_dates(self):
+        """Dates observed for every country, i.e. pivot.dropna(how="any").index."""
+        if self._complete is None and not np.isnan(self.fill_value):
+            self._complete = self.dates
+        if self._complete is None:
+            per_date = self.obs.groupby(level=1).size()
+            self._complete = pd.DatetimeIndex(per_date.index[per_date.to_numpy() == len(self.countries)],
+                                              name=self.date_level)
+        return self._complete
+
+    def wide(self, countries=None, dates=None):
+        """Dense date x country slice for the given countries/dates only."""
+        obs = self.obs
+        if countries is not None:
+            obs = obs[obs.index.get_level_values(0).isin(countries)]
+        if dates is not None:
+            obs = obs[obs.index.get_level_values(1).isin(dates)]
+        frame = obs.unstack(level=0, fill_value=self.fill_value)
+        frame = frame.reindex(index=dates if dates is not None else self.dates,
+                              columns=countries if countries is not None else self.countries,
+                              fill_value=self.fill_value)
+        frame.index.name = self.date_level
+        frame.columns = pd.Index(frame.columns, name=self.country_level)
+        return frame
+
+    def group_sum(self, countries):
+        """pivot[countries].sum(axis=1) over the full date range.
+
+        A country listed more than once is added that many times, as the
+        pivot selection would.
+        """
+        weights = pd.Series(countries).value_counts()
+        level = self.obs.index.get_level_values(0)
+        obs = self.obs[level.isin(weights.index)]
+        obs = obs * weights.reindex(level[level.isin(weights.index)]).to_numpy()
+        return obs.groupby(level=1).sum().reindex(self.dates, fill_value=0.0)
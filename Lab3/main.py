@@ -1,76 +1,126 @@
-import sys, pandas as pd, numpy as np
+import argparse, os, sys, time, pandas as pd
 from scipy import stats
-from difflib import get_close_matches
 
-fn = sys.argv[1] if len(sys.argv)>1 else "owid-covid-data.csv"
-print("Loading:", fn)
-df = pd.read_csv(fn, low_memory=False)
-print("Columns:", list(df.columns))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.frame_cache import FrameCache
+from agg_utils import CategoryAggregator
+from corr_utils import NormalityCache, correlation_matrices, top_pairs
+from country_resolver import CountryResolver
+from forecast_utils import group_series, run_forecasts
+from groups import groups
+from long_format import LongPanel
+from owid_io import DATE_COLS, load, read_chunked
 
-# parse date & numeric fields
-date_col = next((c for c in ("date","zvit_date","report_date") if c in df.columns), "date")
-df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-for c in ["total_cases","new_cases","total_tests","new_tests"]:
-    if c in df.columns: df[c] = pd.to_numeric(df[c], errors="coerce")
+parser = argparse.ArgumentParser(description="OWID COVID-19 analysis")
+parser.add_argument("fn", nargs="?", default="owid-covid-data.csv")
+parser.add_argument("--long", action="store_true",
+                    help="keep (country, date) observations in long format instead of a dense pivot")
+parser.add_argument("--chunksize", type=int, default=None,
+                    help="stream the CSV in chunks of this many rows (implies --long)")
+parser.add_argument("--extra-cols", default=None,
+                    help="comma-separated extra numeric columns to read in chunked mode")
+parser.add_argument("--corr-all", action="store_true",
+                    help="also compute Pearson/Spearman matrices for all countries")
+parser.add_argument("--corr-countries", default=None,
+                    help="comma-separated countries for the correlation matrices")
+parser.add_argument("--workers", type=int, default=None,
+                    help="processes for group forecasting (default: CPU count, 1 = sequential)")
+args = parser.parse_args()
+fn = args.fn
+print("Loading:", fn)
+count_keys = ("continent","test_units","tests_units")
+if args.chunksize:
+    start = time.perf_counter()
+    src = read_chunked(fn, args.chunksize, extra_cols=args.extra_cols.split(",") if args.extra_cols else ())
+    columns, date_col, cases_col, cats, agg = src["columns"], src["date_col"], src["cases_col"], src["cats"], src["agg"]
+    agg_secs = time.perf_counter() - start
+    print("Columns:", columns)
+    print(f"Streamed {src['rows']} rows in chunks of {args.chunksize} in {agg_secs:.2f}s, "
+          f"largest chunk {src['peak_chunk_bytes']/2**20:.1f} MiB")
+    print("\n[2] Converted to category:", cats)
+else:
+    cache = FrameCache()
+    df = cache.load(fn, lambda: load(fn), tag="owid parsed+dtype plan")
+    cache.report()
+    columns = list(df.columns)
+    print("Columns:", columns)
+    date_col = next((c for c in DATE_COLS if c in df.columns), "date")
+    cats = df.select_dtypes(include=["category"]).columns.tolist()
+    print("\n[2] Converted to category:", cats)
 
-# 2. convert up to 4 repeated-value object cols to category
-obj = df.select_dtypes(include=["object"]).columns.tolist()
-n = len(df)
-cand = [(c, df[c].nunique(dropna=True)) for c in obj]
-cand = sorted([x for x in cand if x[1] <= max(50,0.5*n)], key=lambda x:x[1])[:4]
-cats = [c for c,_ in cand]
-for c in cats: df[c]=df[c].astype("category")
-print("\n[2] Converted to category:", cats)
+    cases_col = "total_cases" if "total_cases" in df.columns else ("new_cases" if "new_cases" in df.columns else None)
+    if not cases_col:
+        raise SystemExit("No total_cases/new_cases in dataset")
+    # counts and sums for every key of steps [3] and [4] in one scan over the codes
+    agg = CategoryAggregator(dict.fromkeys([k for k in count_keys if k in df.columns] + cats), cases_col)
+    start = time.perf_counter()
+    agg.update(df)
+    agg_secs = time.perf_counter() - start
 
 # 3. value_counts for 'continent' and 'test_units' (if present)
 print("\n[3] value_counts -> to_frame:")
-for key in ("continent","test_units","tests_units"):
-    if key in df.columns:
-        vc = df[key].value_counts(dropna=False)
+for key in count_keys:
+    if key in columns:
+        vc = agg.counts(key, dropna=False)
         print(f"\n{key}:")
         print(vc.to_frame(name="count"))
     else:
         print(f"\n{key} — not present")
 
 # 4. total cases per category (sum total_cases)
-cases_col = "total_cases" if "total_cases" in df.columns else ("new_cases" if "new_cases" in df.columns else None)
-if not cases_col:
-    raise SystemExit("No total_cases/new_cases in dataset")
-print(f"\n[4] Aggregation using '{cases_col}':")
+print(f"\n[4] Aggregation using '{cases_col}' ({len(agg.keys)} keys aggregated in {agg_secs:.3f}s):")
 pd.options.display.float_format = "{:,.2f}".format
-for c in df.select_dtypes(include=["category"]).columns:
-    agg = df.groupby(c, observed=False)[cases_col].sum().sort_values(ascending=False)
+for c in cats:
     print(f"\n- {c} (top 8):")
-    print(agg.head(8).to_frame(name="total_"+cases_col))
+    print(agg.top(c, 8).to_frame(name="total_"+cases_col))
 
 # 5. pivot: date x country
-country_col = next((c for c in ("location","country","iso_code") if c in df.columns), "location")
-if country_col not in df.columns: raise SystemExit("No country/location column")
-print(f"\n[5] Pivot by date x {country_col} using '{cases_col}' (show head).")
-pivot = pd.pivot_table(df, values=cases_col, index=date_col, columns=country_col, aggfunc="sum")
-pivot = pivot.sort_index()
-print("Pivot shape:", pivot.shape)
-print(pivot.head(6))
+country_col = next((c for c in ("location","country","iso_code") if c in columns), "location")
+if country_col not in columns: raise SystemExit("No country/location column")
+if args.long or args.chunksize:
+    print(f"\n[5] Long (country, date) panel using '{cases_col}' (show head as pivot).")
+    panel = src["panel"] if args.chunksize else LongPanel.from_frame(df, country_col, date_col, cases_col)
+    used, dense = panel.memory_report()
+    print("Pivot shape:", panel.shape, f"stored as {len(panel.obs)} observations,",
+          f"{used/2**20:.1f} MiB vs {dense/2**20:.1f} MiB dense")
+    print(panel.wide(dates=panel.dates[:6]))
+
+    # 6. drop missing rows (any): dates where every country has a value
+    clean_dates = panel.complete_dates()
+    print("\n[6] After dropna(how='any') shape:", panel.shape, "->", (len(clean_dates), panel.shape[1]))
+    print("Pivot_clean head:")
+    print(panel.wide(dates=clean_dates[:5]))
+    all_countries = panel.countries
+    clean_frame = lambda countries=None: panel.wide(countries, dates=clean_dates)
+    group_sum = panel.group_sum
+else:
+    print(f"\n[5] Pivot by date x {country_col} using '{cases_col}' (show head).")
+    pivot = pd.pivot_table(df, values=cases_col, index=date_col, columns=country_col, aggfunc="sum")
+    pivot = pivot.sort_index()
+    print("Pivot shape:", pivot.shape)
+    print(pivot.head(6))
 
-# 6. drop missing rows (any)
-pivot_clean = pivot.dropna(how="any")
-print("\n[6] After dropna(how='any') shape:", pivot.shape, "->", pivot_clean.shape)
-print("Pivot_clean head:")
-print(pivot_clean.head(5))
+    # 6. drop missing rows (any)
+    pivot_clean = pivot.dropna(how="any")
+    print("\n[6] After dropna(how='any') shape:", pivot.shape, "->", pivot_clean.shape)
+    print("Pivot_clean head:")
+    print(pivot_clean.head(5))
+    all_countries = list(pivot.columns)
+    clean_frame = lambda countries=None: pivot_clean if countries is None else pivot_clean[countries]
+    group_sum = lambda present: pivot[present].sum(axis=1)
 
 # helper: robust country matching
-all_countries = list(pivot.columns)
-def match(name):
-    if name in all_countries: return name
-    L = [c for c in all_countries if c.lower()==name.lower()]
-    if L: return L[0]
-    m = get_close_matches(name, all_countries, n=1, cutoff=0.7)
-    return m[0] if m else None
+if args.chunksize:
+    resolver = CountryResolver(all_countries, iso_codes=src["iso"])
+else:
+    resolver = CountryResolver.from_frame(df, country_col, names=all_countries)
+match = resolver.resolve
 
 # 7. Correlation test: Poland vs (Hungary, Czechia, Slovakia)
 base = "Poland"
 compares = ["Hungary","Czechia","Slovakia"]
 base_m = match(base)
+normality = NormalityCache()
 print(f"\n[7] Correlation tests: base={base} -> matched: {base_m}")
 if not base_m:
     print(" Base country not found in dataset")
@@ -80,70 +130,58 @@ else:
         if not cm:
             print(" Compare", c, "-> not found")
             continue
-        s1 = pivot_clean[base_m]; s2 = pivot_clean[cm]
-        # choose Pearson if both approx normal
-        use_pearson = False
-        try:
-            if len(s1)<=5000 and len(s2)<=5000:
-                p1 = stats.shapiro(s1)[1]; p2 = stats.shapiro(s2)[1]
-                use_pearson = (p1>0.05 and p2>0.05)
-            else:
-                p1 = stats.normaltest(s1)[1]; p2 = stats.normaltest(s2)[1]
-                use_pearson = (p1>0.05 and p2>0.05)
-        except Exception:
-            use_pearson = False
+        pair = clean_frame([base_m, cm])
+        s1 = pair[base_m]; s2 = pair[cm]
+        # choose Pearson if both approx normal (base is tested once, not per pair)
+        p1 = normality(base_m, s1); p2 = normality(cm, s2)
+        use_pearson = bool(p1>0.05 and p2>0.05)
         if use_pearson:
             r,p = stats.pearsonr(s1,s2); method="Pearson"
         else:
             r,p = stats.spearmanr(s1,s2); method="Spearman"
         print(f" {base_m} vs {cm} -> method={method}, r={r:.4f}, p={p:.4e}")
         print("  sample pairs (first 6):")
-        print(pivot_clean[[base_m,cm]].head(6))
+        print(pair.head(6))
 
-# 8. Forecasting for groups (list from assignment). use cumulative total_cases (already cumulative).
-groups = {
- "scandinavia":["Sweden","Norway","Denmark","Finland"],
- "benelux":["Belgium","Netherlands","Luxembourg"],
- "eu4":["Poland","Hungary","Czechia","Slovakia"],
- "arabian":["Saudi Arabia","Yemen","Oman","United Arab Emirates"],
- "asia_rok_hk_sg_tw":["South Korea","Hong Kong","Singapore","Taiwan"],
- "mong_china_viet":["Mongolia","China","Vietnam"],
- "north_africa_4":["Morocco","Algeria","Tunisia","Libya"],
- "south_africa_4":["South Africa","Namibia","Botswana","Lesotho"],
- "india_nepal_pk":["India","Nepal","Pakistan"],
- "south_america_4":["Brazil","Argentina","Colombia","Chile"],
- "baltic_4":["Estonia","Latvia","Lithuania","Lithuania"], # adjust if needed
- "balkan_4":["Slovenia","Croatia","Serbia","Bosnia and Herzegovina"],
- "pol_hun_cze_svk":["Poland","Hungary","Czechia","Slovakia"],
- "svn_hrv_ltu_lva":["Slovenia","Croatia","Lithuania","Latvia"],
- "bul_rom_ukr_alb":["Bulgaria","Romania","Ukraine","Albania"],
- "nafta":["Canada","United States","Mexico"]
-}
+# 7b. all-pairs correlation matrix (optional)
+if args.corr_all or args.corr_countries:
+    sel = None
+    if args.corr_countries:
+        sel = [m for m in resolver.resolve_many(args.corr_countries.split(",")) if m]
+        sel = list(dict.fromkeys(sel))
+    frame = clean_frame(sel)
+    start = time.perf_counter()
+    corr = correlation_matrices(frame, normality)
+    print(f"\n[7b] Correlation matrices for {frame.shape[1]} countries x {frame.shape[0]} dates "
+          f"in {time.perf_counter()-start:.2f}s")
+    if frame.shape[1] <= 10:
+        print("Pearson:"); print(corr["pearson"])
+        print("Spearman:"); print(corr["spearman"])
+    print("Strongest pairs:")
+    print(top_pairs(corr, k=10).to_string(index=False, formatters={"r": "{:.4f}".format, "p": "{:.4e}".format}))
 
+# 8. Forecasting for groups (list from assignment). use cumulative total_cases (already cumulative).
 print("\n[8] Forecasting (14 days) for groups — history tail (3) + forecast head (5)")
-try:
-    from statsmodels.tsa.holtwinters import ExponentialSmoothing
-    hw=True
-except Exception:
-    hw=False
+jobs = {}; present_by_group = {}
 for g, lst in groups.items():
-    matched = [match(x) for x in lst]
+    matched = resolver.resolve_many(lst)
     present = [m for m in matched if m]
+    present_by_group[g] = present
+    if present:
+        jobs[g] = group_series(group_sum, present)
+start = time.perf_counter()
+results = {name: (f, method, secs) for name, f, method, secs, _ in run_forecasts(jobs, steps=14, workers=args.workers)}
+for g in groups:
+    present = present_by_group[g]
     if not present:
         print(f"\n{g}: no countries found in dataset")
         continue
-    series = pivot[present].sum(axis=1).asfreq("D", fill_value=np.nan).ffill().fillna(0)
+    series = jobs[g]
+    f, method, secs = results[g]
     print(f"\nGroup {g} -> present: {present}")
     print(" History last 3:", list(series.iloc[-3:]))
-    steps=14
-    if hw and series.dropna().shape[0] > 5:
-        try:
-            fit = ExponentialSmoothing(series, trend="add", seasonal=None, initialization_method="estimated").fit()
-            f = fit.forecast(steps)
-        except Exception:
-            f = pd.Series([series.iloc[-1]]*steps, index=pd.date_range(series.index[-1]+pd.Timedelta(days=1), periods=steps))
-    else:
-        f = pd.Series([series.iloc[-1]]*steps, index=pd.date_range(series.index[-1]+pd.Timedelta(days=1), periods=steps))
     print(" Forecast next 5:", list(map(float, f.iloc[:5])))
+    print(f" Fit: {method} in {secs:.3f}s")
+print(f"\n[8] {len(jobs)} forecasts in {time.perf_counter()-start:.2f}s (workers={args.workers or os.cpu_count()})")
 print("\n--- DONE ---")
 
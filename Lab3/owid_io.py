@@ -0,0 +1,73 @@
+import os, sys
+import numpy as np, pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.dtype_planner import DistinctSketch, category_limit, format_memory, optimize
+
+DATE_COLS = ("date","zvit_date","report_date")
+NUMERIC_COLS = ["total_cases","new_cases","total_tests","new_tests"]
+
+def load(fn):
+    df = pd.read_csv(fn, low_memory=False)
+    # parse date & numeric fields
+    date_col = next((c for c in DATE_COLS if c in df.columns), "date")
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    for c in NUMERIC_COLS:
+        if c in df.columns: df[c] = pd.to_numeric(df[c], errors="coerce")
+    # 2. one profiling pass: repeated-value text -> category, other numerics -> small ints/float32;
+    # the case/test columns stay float64 so sums and correlations are unchanged
+    report = optimize(df, keep=NUMERIC_COLS)
+    print("[2] Dtype plan:", format_memory(report))
+    return df
+
+# Text columns the pipeline reads in chunked mode (steps [2]-[5], [7])
+KEY_COLS = ("iso_code","continent","location","country","tests_units","test_units")
+
+def read_chunked(fn, chunksize, extra_cols=()):
+    """One streaming pass over the CSV for the chunked pipeline.
+
+    Only the date, key text columns, the case/test columns and `extra_cols`
+    are parsed; numerics are read as float32 except the cases column, which
+    is summed and kept as float64 so large cumulative totals stay exact.
+    Per chunk it updates distinct-value sketches (for the step [2] category
+    choice), updates a CategoryAggregator (steps [3]-[4]) and adds the
+    (country, date) sums of the cases column (the long-format pivot). Memory
+    is bounded by the chunk plus the aggregates, not by the file.
+    """
+    from agg_utils import CategoryAggregator
+    from long_format import LongPanel
+
+    header = pd.read_csv(fn, nrows=0).columns
+    date_col = next((c for c in DATE_COLS if c in header), "date")
+    country_col = next((c for c in ("location","country","iso_code") if c in header), "location")
+    cases_col = "total_cases" if "total_cases" in header else ("new_cases" if "new_cases" in header else None)
+    if not cases_col: raise SystemExit("No total_cases/new_cases in dataset")
+    if country_col not in header: raise SystemExit("No country/location column")
+    text = [c for c in KEY_COLS if c in header]
+    numeric = [c for c in dict.fromkeys(NUMERIC_COLS + list(extra_cols)) if c in header]
+    dtype = {c: ("float64" if c == cases_col else "float32") for c in numeric}
+    dtype.update({c: "object" for c in text})
+
+    agg = CategoryAggregator(text, cases_col)
+    distinct = {c: DistinctSketch() for c in text}
+    parts, iso, rows, peak = [], {}, 0, 0
+    reader = pd.read_csv(fn, usecols=[date_col] + text + numeric, dtype=dtype, chunksize=chunksize)
+    for chunk in reader:
+        chunk[date_col] = pd.to_datetime(chunk[date_col], errors="coerce")
+        rows += len(chunk)
+        peak = max(peak, int(chunk.memory_usage(deep=True).sum()))
+        for c in text: distinct[c].update(chunk[c])
+        agg.update(chunk)
+        parts.append(chunk.groupby([country_col, date_col], sort=False)[cases_col].sum())
+        if "iso_code" in text and country_col != "iso_code":
+            pairs = chunk[["iso_code", country_col]].dropna().drop_duplicates("iso_code")
+            for code, name in zip(pairs["iso_code"], pairs[country_col]): iso.setdefault(code, name)
+        if len(parts) >= 32:
+            parts = [pd.concat(parts).groupby(level=[0, 1]).sum()]
+    obs = pd.concat(parts).groupby(level=[0, 1], sort=True).sum()
+
+    # 2. same category rule as load()
+    cats = [c for c in header if c in distinct and distinct[c].estimate()[0] <= category_limit(rows)]
+    panel = LongPanel(obs, fill_value=0.0 if country_col in cats else np.nan)
+    return {"columns": [date_col] + text + numeric, "rows": rows, "date_col": date_col, "country_col": country_col,
+            "cases_col": cases_col, "cats": cats, "agg": agg, "panel": panel, "iso": iso, "peak_chunk_bytes": peak}
@@ -0,0 +1 @@
+"""Synthetic datasets and stage benchmarks for the lab pipelines."""
@@ -0,0 +1,113 @@
+"""Synthetic stand-ins for the three lab datasets.
+
+The frames have the column names, dtypes and value quirks the lab code
+relies on (mixed Yes/No spellings, day-first date strings, missing
+temperatures, cumulative OWID case counts with gaps), at any row count.
+"""
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+COFFEES = ["Latte", "Americano", "Americano with Milk", "Cappuccino", "Cortado",
+           "Hot Chocolate", "Espresso", "Cocoa"]
+PRICES = [38.7, 25.96, 30.86, 35.76, 25.96, 35.76, 20.06, 35.76]
+
+YES_NO = ["Yes", "No", "yes", "no ", "Так", "Ні", "Maybe", "Maybe (можливо)", "maybe ", True, False, 1, 0]
+BOOL_COLUMNS = [
+    'Do you smoke?',
+    "Have you had Covid'19 this year?",
+    'Have you had influenza this year?',
+    'Do you vaccinated influenza?',
+    'Do you vaccinated tuberculosis?',
+    'Have you had tuberculosis this year?',
+]
+
+CONTINENTS = ["Europe", "Asia", "Africa", "North America", "South America", "Oceania"]
+# Names used by Lab3 groups, so matching and forecasting see real hits
+KNOWN_COUNTRIES = ["Poland", "Hungary", "Czechia", "Slovakia", "Sweden", "Norway", "Denmark", "Finland",
+                   "Belgium", "Netherlands", "Luxembourg", "South Korea", "Singapore", "China", "Vietnam",
+                   "Morocco", "Algeria", "India", "Nepal", "Pakistan", "Brazil", "Argentina", "Chile",
+                   "Canada", "United States", "Mexico", "Slovenia", "Croatia", "Latvia", "Lithuania"]
+
+
+def coffee_sales(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2024-03-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n), unit="s")
+    item = rng.integers(0, len(COFFEES), n)
+    hour = ts.hour
+    return pd.DataFrame({
+        "hour_of_day": hour,
+        "cash_type": np.where(rng.random(n) < 0.9, "card", "cash"),
+        "money": np.asarray(PRICES)[item],
+        "coffee_name": np.asarray(COFFEES)[item],
+        "Time_of_Day": np.select([hour < 12, hour < 17], ["Morning", "Afternoon"], "Night"),
+        "Weekday": ts.strftime("%a"),
+        "Month_name": ts.strftime("%b"),
+        "Weekdaynumber": ts.weekday + 1,
+        "Monthsort": ts.month,
+        "Date": ts.strftime("%Y-%m-%d"),
+        "Time": ts.strftime("%H:%M:%S.%f"),
+    })
+
+
+def covid_survey(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n), unit="min")
+    df = pd.DataFrame({
+        "Date time": ts.strftime("%d.%m.%Y %H:%M"),
+        "Gender": rng.choice(["Male", "Female"], n),
+        "Region": rng.choice(["Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro"], n),
+        "Blood group": rng.choice(["I", "II", "III", "IV"], n),
+        "Age": rng.integers(16, 90, n),
+    })
+    for col in BOOL_COLUMNS:
+        df[col] = pd.Series(np.asarray(YES_NO, dtype=object)[rng.integers(0, len(YES_NO), n)], dtype=object)
+    temp = np.round(rng.normal(37.4, 0.8, n), 1)
+    temp[rng.random(n) < 0.15] = np.nan
+    df["Maximum body temperature"] = temp
+    df["IgG level"] = np.round(rng.gamma(2.0, 3.0, n), 2)
+    # a few fully empty rows, as in the survey export
+    empty = rng.random(n) < 0.002
+    df = df.astype({c: object for c in df.columns})
+    df.loc[empty, :] = np.nan
+    return df
+
+
+def owid(n, seed=0, countries=250):
+    """About `n` rows: `countries` locations x n/countries consecutive days."""
+    rng = np.random.default_rng(seed)
+    countries = max(len(KNOWN_COUNTRIES), countries)
+    days = max(30, n // countries)
+    names = KNOWN_COUNTRIES + [f"Country {i}" for i in range(countries - len(KNOWN_COUNTRIES))]
+    dates = pd.date_range("2020-01-22", periods=days, freq="D")
+    loc = np.repeat(np.arange(countries), days)
+    day = np.tile(np.arange(days), countries)
+    new_cases = rng.poisson(rng.uniform(5, 5000, countries)[loc]).astype("float64")
+    total = pd.Series(new_cases).groupby(loc).cumsum().to_numpy()
+    total[rng.random(len(total)) < 0.02] = np.nan
+    df = pd.DataFrame({
+        "iso_code": np.asarray([f"C{i:03d}" for i in range(countries)])[loc],
+        "continent": np.asarray(CONTINENTS)[loc % len(CONTINENTS)],
+        "location": np.asarray(names)[loc],
+        "date": dates[day].strftime("%Y-%m-%d"),
+        "total_cases": total,
+        "new_cases": new_cases,
+        "total_tests": total * 8,
+        "new_tests": new_cases * 8,
+        "tests_units": rng.choice(["tests performed", "people tested", "samples tested", None], len(loc)),
+        "population": rng.uniform(1e5, 1e9, countries)[loc].round(),
+        "people_vaccinated": np.where(day > days // 2, total * 2, np.nan),
+        "hosp_patients": np.round(new_cases * 0.1),
+    })
+    # Late starters, so the pivot has leading holes
+    keep = day >= (loc % 20)
+    return df[keep].reset_index(drop=True)
+
+
+def write_coffee_zip(df, path, member="Coffe_sales.csv"):
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(member, buf.getvalue())
@@ -0,0 +1,285 @@
+"""Stage benchmarks for the three lab pipelines on synthetic data.
+
+    python bench/run.py --scales 10k,100k,1M [--labs lab1,lab3] [--stages load,pivot]
+                        [--out results.json] [--compare old.json]
+
+For every scale the generators in bench/generators.py build a dataset of
+that many rows, write it in the lab's input format (zip, xlsx, csv) and run
+the lab's own load and processing functions stage by stage. Each stage
+records wall and CPU time, the tracemalloc peak and the rows it produced.
+Results are written as JSON together with the git commit and library
+versions; --compare prints the time and memory ratios against an earlier
+results file.
+"""
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _lab in ("Lab1", "Lab2", "Lab3"):
+    sys.path.insert(0, os.path.join(ROOT, _lab))
+sys.path.insert(0, ROOT)
+
+from bench import generators  # noqa: E402
+
+# Writing and reading xlsx through openpyxl takes about a second per thousand
+# rows, so larger survey datasets skip the load stage
+XLSX_LIMIT = 20_000
+
+
+def parse_scale(text):
+    text = text.strip().lower()
+    mult = {"k": 10 ** 3, "m": 10 ** 6}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, text=True).strip())
+        return commit + ("-dirty" if dirty else "")
+    except Exception:
+        return None
+
+
+def metadata():
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__}
+    for mod in ("scipy", "statsmodels", "pyarrow", "openpyxl"):
+        try:
+            versions[mod] = __import__(mod).__version__
+        except Exception:
+            versions[mod] = None
+    return {"commit": git_commit(), "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(), "cpus": os.cpu_count(), "versions": versions}
+
+
+def _rows(out):
+    if isinstance(out, (pd.DataFrame, pd.Series)):
+        return len(out)
+    return getattr(out, "rows", None)
+
+
+class Runner:
+    """Runs stages in order and collects one result record per stage."""
+
+    def __init__(self, stages=None, trace=True, quiet=True):
+        self.stages = stages
+        self.trace = trace
+        self.quiet = quiet
+        self.results = []
+
+    def run(self, lab, scale, name, fn, *args):
+        if self.stages and name not in self.stages:
+            return None
+        if self.trace:
+            tracemalloc.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        # The lab functions report progress with print(); keep the bench output readable
+        with contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext():
+            out = fn(*args)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = None
+        if self.trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        record = {"lab": lab, "scale": scale, "stage": name, "seconds": round(wall, 4), "cpu_seconds": round(cpu, 4),
+                  "peak_mib": None if peak is None else round(peak / 2 ** 20, 2), "rows_out": _rows(out),
+                  "maxrss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10, 1)}
+        self.results.append(record)
+        peak_text = "" if peak is None else f", peak {record['peak_mib']:.1f} MiB"
+        print(f"  {lab} {name:<14} {wall:8.3f}s{peak_text}, rows {record['rows_out']}")
+        return out
+
+
+def bench_lab1(runner, n, workdir, args):
+    import file_utils
+    from report_utils import StreamingReport
+
+    df = generators.coffee_sales(n, args.seed)
+    generators.write_coffee_zip(df, os.path.join(workdir, file_utils.zip_path))
+    del df
+
+    def report(frame, approximate=False):
+        r = StreamingReport(approximate=approximate)
+        r.update(frame)
+        r.describe()
+        return r
+
+    def stream():
+        r = StreamingReport()
+        for chunk in file_utils.load_data(chunksize=args.chunksize, use_cache=False):
+            r.update(chunk)
+        r.describe()
+        return r
+
+    cwd = os.getcwd()
+    os.chdir(workdir)  # file_utils resolves the archive relative to the working directory
+    try:
+        df = runner.run("lab1", n, "load", file_utils.load_data, None, None, None, False, False)
+        if df is not None:
+            runner.run("lab1", n, "report", report, df)
+            runner.run("lab1", n, "report_approx", report, df, True)
+        runner.run("lab1", n, "stream_report", stream)
+    finally:
+        os.chdir(cwd)
+
+
+def bench_lab2(runner, n, workdir, args):
+    from bool_utils import normalize_bool_columns
+    from date_utils import date_parts, parse_dates
+    from impute_utils import impute
+
+    # MAYBE_VARIANTS lives in the menu script; load it under its own name
+    spec = importlib.util.spec_from_file_location("lab2_main", os.path.join(ROOT, "Lab2", "main.py"))
+    lab2 = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lab2)
+
+    df = generators.covid_survey(n, args.seed)
+    if n <= args.xlsx_limit and (not runner.stages or "load" in runner.stages):
+        path = os.path.join(workdir, "COVID_19.xlsx")
+        df.to_excel(path, index=False)
+        df = runner.run("lab2", n, "load", pd.read_excel, path)
+
+    def dates(frame):
+        parsed, _ = parse_dates(frame["Date time"], dayfirst=True)
+        parts = date_parts(parsed)
+        frame[list(parts.columns)] = parts
+        return parts
+
+    def bools(frame):
+        frame.dropna(how="all", inplace=True)
+        normalize_bool_columns(frame, generators.BOOL_COLUMNS, maybe=lab2.MAYBE_VARIANTS)
+        return frame
+
+    def imputation(frame):
+        col = "Maximum body temperature"
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+        impute(frame, col, by=["Gender"], strategy="median")
+        return frame[col]
+
+    # Same order as the full pipeline: rows are dropped before the dates are parsed
+    runner.run("lab2", n, "bool_mapping", bools, df)
+    runner.run("lab2", n, "imputation", imputation, df)
+    runner.run("lab2", n, "parse_dates", dates, df)
+
+
+def bench_lab3(runner, n, workdir, args):
+    import owid_io
+    from agg_utils import CategoryAggregator
+    from corr_utils import correlation_matrices
+    from country_resolver import CountryResolver
+    from forecast_utils import group_series, run_forecasts
+    from groups import groups
+    from long_format import LongPanel
+
+    path = os.path.join(workdir, "owid-covid-data.csv")
+    generators.owid(n, args.seed, countries=args.countries).to_csv(path, index=False)
+    df = runner.run("lab3", n, "load", owid_io.load, path)
+    if df is None:
+        df = owid_io.load(path)
+    cats = df.select_dtypes(include=["category"]).columns.tolist()
+
+    def aggregate():
+        agg = CategoryAggregator(dict.fromkeys(["continent", "tests_units"] + cats), "total_cases")
+        agg.update(df)
+        return agg.counts("continent")
+
+    def pivot():
+        p = pd.pivot_table(df, values="total_cases", index="date", columns="location", aggfunc="sum",
+                           observed=False).sort_index()
+        return p.dropna(how="any")
+
+    def long_pivot():
+        panel = LongPanel.from_frame(df, "location", "date", "total_cases")
+        return panel.wide(dates=panel.complete_dates())
+
+    panel = LongPanel.from_frame(df, "location", "date", "total_cases")
+    clean = panel.wide(dates=panel.complete_dates())
+    resolver = CountryResolver.from_frame(df, "location", names=panel.countries)
+    jobs = {}
+    for g, lst in groups.items():
+        present = [m for m in resolver.resolve_many(lst) if m]
+        if present:
+            jobs[g] = group_series(panel.group_sum, present)
+
+    runner.run("lab3", n, "aggregate", aggregate)
+    runner.run("lab3", n, "pivot", pivot)
+    runner.run("lab3", n, "pivot_long", long_pivot)
+    runner.run("lab3", n, "correlation", lambda: correlation_matrices(clean)["pearson"])
+    runner.run("lab3", n, "forecasting", lambda: pd.Series(run_forecasts(jobs, steps=14, workers=args.workers)))
+
+
+LABS = {"lab1": bench_lab1, "lab2": bench_lab2, "lab3": bench_lab3}
+
+
+def compare(results, old_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    key = lambda r: (r["lab"], r["scale"], r["stage"])
+    before = {key(r): r for r in old["results"]}
+    print(f"\nCompared with {old_path} (commit {old['meta'].get('commit')}):")
+    print(f"  {'lab':<5} {'scale':>10} {'stage':<14} {'old s':>9} {'new s':>9} {'time x':>7} {'mem x':>7}")
+    for r in results:
+        o = before.get(key(r))
+        if o is None:
+            continue
+        t = r["seconds"] / o["seconds"] if o["seconds"] else float("nan")
+        m = (r["peak_mib"] / o["peak_mib"]) if r["peak_mib"] and o.get("peak_mib") else float("nan")
+        print(f"  {r['lab']:<5} {r['scale']:>10} {r['stage']:<14} {o['seconds']:9.3f} {r['seconds']:9.3f} {t:7.2f} {m:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lab pipelines on synthetic data")
+    parser.add_argument("--scales", default="10k,100k", help="comma-separated row counts, k/M suffixes allowed")
+    parser.add_argument("--labs", default="lab1,lab2,lab3", help="comma-separated subset of lab1,lab2,lab3")
+    parser.add_argument("--stages", default=None, help="comma-separated stage names to run (default: all)")
+    parser.add_argument("--out", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=100_000, help="chunk size of the Lab1 stream_report stage")
+    parser.add_argument("--countries", type=int, default=250, help="locations in the OWID dataset")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the forecasting stage")
+    parser.add_argument("--xlsx-limit", type=int, default=XLSX_LIMIT, help="largest Lab2 scale read from xlsx")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip peak memory tracing (less overhead)")
+    parser.add_argument("--verbose", action="store_true", help="show the labs' own output")
+    args = parser.parse_args()
+
+    scales = [parse_scale(s) for s in args.scales.split(",")]
+    labs = [lab.strip().lower() for lab in args.labs.split(",")]
+    unknown = [lab for lab in labs if lab not in LABS]
+    if unknown:
+        raise SystemExit(f"Unknown labs: {unknown}")
+    stages = set(args.stages.split(",")) if args.stages else None
+    runner = Runner(stages, trace=not args.no_tracemalloc, quiet=not args.verbose)
+
+    for n in scales:
+        for lab in labs:
+            print(f"{lab} at {n:,} rows:")
+            with tempfile.TemporaryDirectory(prefix=f"bench_{lab}_") as workdir:
+                LABS[lab](runner, n, workdir, args)
+
+    out = {"meta": dict(metadata(), scales=scales, labs=labs, workers=args.workers), "results": runner.results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2)
+        print("Results written to", args.out)
+    if args.compare:
+        compare(runner.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
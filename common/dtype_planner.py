@@ -0,0 +1,156 @@
+"""Compact dtype planning for DataFrames.
+
+A frame is profiled once per column: null count, numeric range, whether
+float values are whole numbers, and an estimate of the number of distinct
+values from a K-minimum-values sketch over 64-bit value hashes (exact when
+the column has fewer than K distinct values). The plan then turns
+low-cardinality text into category, integers and whole-number floats into
+the smallest integer type that holds their range (nullable when values are
+missing) and other floats into float32.
+"""
+import numpy as np
+import pandas as pd
+
+# Distinct hashes kept by the sketch; the relative error is about 1/sqrt(KMV_K)
+KMV_K = 1024
+# Text columns become category when they have at most
+# max(MIN_CATEGORIES, CATEGORY_RATIO * rows) distinct values
+CATEGORY_RATIO = 0.5
+MIN_CATEGORIES = 50
+
+# Rows hashed at a time by DistinctSketch.update()
+BLOCK_ROWS = 1 << 20
+
+_INT_TYPES = ("int8", "int16", "int32", "int64")
+_HASH_RANGE = 2.0 ** 64
+
+
+class DistinctSketch:
+    """K-minimum-values sketch of the distinct values of a column.
+
+    Keeps the k smallest distinct 64-bit hashes seen so far, so memory is
+    O(k) however long the column is, and update() can be fed chunk by
+    chunk. Until more than k distinct hashes have been seen the count is
+    exact.
+    """
+
+    def __init__(self, k=KMV_K):
+        self.k = k
+        self.hashes = np.empty(0, dtype="uint64")
+        self.truncated = False
+
+    def update(self, values):
+        s = pd.Series(values)
+        for start in range(0, len(s), BLOCK_ROWS):
+            # Only the distinct values of a block are hashed
+            uniques = pd.Series(s.iloc[start:start + BLOCK_ROWS].unique()).dropna()
+            h = pd.util.hash_pandas_object(uniques, index=False, categorize=False).to_numpy()
+            if self.truncated:
+                h = h[h < self.hashes[-1]]
+            merged = pd.unique(np.concatenate([self.hashes, h]))
+            if len(merged) > self.k:
+                merged, self.truncated = np.partition(merged, self.k - 1)[:self.k], True
+            self.hashes = np.sort(merged)
+
+    def estimate(self):
+        """(count, exact)."""
+        if not self.truncated:
+            return len(self.hashes), True
+        return int(round((self.k - 1) * _HASH_RANGE / (float(self.hashes[-1]) + 1.0))), False
+
+
+def estimate_distinct(values, k=KMV_K):
+    """Estimated number of distinct non-null values; returns (count, exact)."""
+    sketch = DistinctSketch(k)
+    sketch.update(values)
+    return sketch.estimate()
+
+
+def category_limit(rows):
+    return max(MIN_CATEGORIES, CATEGORY_RATIO * rows)
+
+
+def _smallest_int(lo, hi, nullable):
+    for name in _INT_TYPES:
+        info = np.iinfo(name)
+        if info.min <= lo and hi <= info.max:
+            return name.capitalize() if nullable else name
+    return None
+
+
+def profile_column(s, k=KMV_K):
+    """Dtype-relevant facts about one column."""
+    p = {"dtype": str(s.dtype), "nulls": int(s.isna().sum()), "kind": "other"}
+    if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(s) \
+            or pd.api.types.is_datetime64_any_dtype(s):
+        return p
+    if pd.api.types.is_integer_dtype(s) or pd.api.types.is_float_dtype(s):
+        values = s.to_numpy(dtype="float64", na_value=np.nan)
+        values = values[~np.isnan(values)]
+        p["kind"] = "int" if pd.api.types.is_integer_dtype(s) else "float"
+        if len(values):
+            p["min"], p["max"] = float(values.min()), float(values.max())
+            p["integral"] = bool(np.isfinite(values).all() and (values == np.round(values)).all())
+        return p
+    if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+        p["kind"] = "text"
+        p["distinct"], p["exact"] = estimate_distinct(s, k)
+    return p
+
+
+def plan_dtypes(df, columns=None, keep=(), categories=True, ints=True, floats=True, whole_floats=True, k=KMV_K):
+    """Profile `df` once and choose a compact dtype per column.
+
+    Returns (plan, profiles): plan maps column -> new dtype for the columns
+    that would change. Columns in `keep` are profiled but never changed.
+    Without `whole_floats` only integer columns are downcast, float columns
+    whose values happen to be whole stay float (e.g. when they are filled
+    with fractional values later).
+    """
+    columns = [c for c in (columns if columns is not None else df.columns) if c in df.columns]
+    limit = category_limit(len(df))
+    plan, profiles = {}, {}
+    for col in columns:
+        s = df[col]
+        p = profiles[col] = profile_column(s, k)
+        if col in keep:
+            continue
+        new = None
+        if p["kind"] == "text":
+            if categories and p["distinct"] <= limit:
+                new = "category"
+        elif p["kind"] in ("int", "float") and "min" in p:
+            if ints and (p["kind"] == "int" or (whole_floats and p["integral"])):
+                nullable = p["nulls"] > 0 or not isinstance(s.dtype, np.dtype)
+                new = _smallest_int(p["min"], p["max"], nullable)
+            if new is None and floats and p["kind"] == "float" and s.dtype != np.float32:
+                new = "float32"
+        if new is not None and new != p["dtype"]:
+            plan[col] = new
+    return plan, profiles
+
+
+def apply_dtypes(df, plan):
+    """Convert df's columns in place; returns memory use before/after and the changes."""
+    before = int(df.memory_usage(deep=True).sum())
+    changes = {}
+    for col, dtype in plan.items():
+        old = str(df[col].dtype)
+        df[col] = df[col].astype(dtype)
+        changes[col] = (old, str(df[col].dtype))
+    after = int(df.memory_usage(deep=True).sum())
+    return {"before": before, "after": after, "changes": changes}
+
+
+def optimize(df, **kw):
+    """plan_dtypes() + apply_dtypes(); returns the report with the profiles added."""
+    plan, profiles = plan_dtypes(df, **kw)
+    report = apply_dtypes(df, plan)
+    report["profiles"] = profiles
+    return report
+
+
+def format_memory(report):
+    before, after = report["before"], report["after"]
+    ratio = before / after if after else float("nan")
+    return f"{before / 2 ** 20:.2f} MiB -> {after / 2 ** 20:.2f} MiB ({ratio:.1f}x smaller)"
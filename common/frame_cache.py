@@ -0,0 +1,248 @@
+"""Columnar on-disk cache for parsed DataFrames.
+
+Each entry is keyed on the source file path plus a caller-supplied tag that
+names the parsing/conversion applied, and is valid while the source keeps
+the same size and mtime. Frames are stored as uncompressed Feather (Arrow
+IPC) files so they can be reloaded through a memory map; columns Arrow
+cannot represent (mixed-type object columns) go to a pickle sidecar.
+
+Several processes may share one cache directory: files are written under
+unique temporary names and renamed into place, and every read-modify-write
+of the manifest holds an exclusive lock on manifest.lock.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAVE_ARROW = True
+except Exception:
+    HAVE_ARROW = False
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".frame_cache")
+MANIFEST = "manifest.json"
+# Part of every key; bumped when the stored layout changes so older entries miss
+FORMAT = 2
+LOCK = "manifest.lock"
+# Data files without a manifest entry are removed once they are this old;
+# younger ones may belong to a process that has not registered them yet
+ORPHAN_AGE = 3600
+
+
+def fingerprint(source):
+    st = os.stat(source)
+    return {"size": st.st_size, "mtime": st.st_mtime_ns}
+
+
+class FrameCache:
+    """Feather cache with hit/miss accounting and LRU/age eviction.
+
+    Entries whose source changed or disappeared are dropped on every
+    eviction pass; after that the least recently used entries are removed
+    until the cache is within `max_bytes`, and anything unused for
+    `max_age_days` is removed regardless of size.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=4 * 2 ** 30, max_age_days=30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _manifest_path(self):
+        return os.path.join(self.cache_dir, MANIFEST)
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=MANIFEST, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=1)
+            os.replace(tmp, self._manifest_path())
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusive lock for a read-modify-write of the manifest."""
+        with open(os.path.join(self.cache_dir, LOCK), "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".feather", base + ".pkl"
+
+    def load(self, source, build, tag=""):
+        """Return the frame for `source`, calling `build()` on a miss.
+
+        `build` must return the fully parsed frame; None is passed through
+        without being cached. Failing to write the cache only prints a
+        warning, the parsed frame is still returned.
+        """
+        if not HAVE_ARROW:
+            self.misses += 1
+            return build()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        source = os.path.abspath(source)
+        key = hashlib.sha1(f"{source}\0{tag}\0{FORMAT}".encode()).hexdigest()
+        data_path, extra_path = self._paths(key)
+        manifest = self._read_manifest()
+        entry = manifest.get(key)
+        fp = fingerprint(source)
+
+        start = time.perf_counter()
+        if entry and entry["fingerprint"] == fp and os.path.exists(data_path):
+            df = self._read(data_path, extra_path if entry.get("extra") else None, entry["columns"])
+            try:
+                with self._locked():
+                    manifest = self._read_manifest()
+                    if key in manifest:
+                        manifest[key]["last_used"] = time.time()
+                        self._write_manifest(manifest)
+            except OSError as e:
+                print(f"Cache: could not update the manifest: {e}")
+            self.hits += 1
+            print(f"Cache hit: {os.path.basename(source)} [{tag}] in {time.perf_counter() - start:.3f}s")
+            return df
+
+        self.misses += 1
+        df = build()
+        if df is None:
+            return df
+        print(f"Cache miss: {os.path.basename(source)} [{tag}] parsed in {time.perf_counter() - start:.3f}s")
+        try:
+            extra = self._write(df, data_path, extra_path)
+            with self._locked():
+                manifest = self._read_manifest()
+                manifest[key] = {
+                    "source": source, "tag": tag, "fingerprint": fp,
+                    "columns": list(df.columns) if extra else None,
+                    "extra": extra,
+                    "bytes": sum(os.path.getsize(p) for p in (data_path, extra_path) if os.path.exists(p)),
+                    "last_used": time.time(),
+                }
+                self._evict(manifest)
+        except (OSError, pa.ArrowException) as e:
+            print(f"Cache: could not store {os.path.basename(source)} [{tag}]: {e}")
+        return df
+
+    def _replace_with(self, path, write):
+        # Readers may have the old file memory-mapped; never rewrite it in place
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _write(self, df, data_path, extra_path):
+        # Columns Arrow rejects are pickled separately; the rest stay columnar
+        bad = []
+        for col in df.columns:
+            if df[col].dtype == object:
+                try:
+                    pa.array(df[col], from_pandas=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    bad.append(col)
+        # None keeps a RangeIndex as metadata, so it comes back as a RangeIndex; other indexes are stored as columns
+        table = pa.Table.from_pandas(df.drop(columns=bad), preserve_index=None)
+        self._replace_with(data_path, lambda tmp: feather.write_feather(table, tmp, compression="uncompressed"))
+        if bad:
+            self._replace_with(extra_path, df[bad].reset_index(drop=True).to_pickle)
+        elif os.path.exists(extra_path):
+            os.remove(extra_path)
+        return bool(bad)
+
+    def _read(self, data_path, extra_path, columns):
+        table = feather.read_table(data_path, memory_map=True)
+        df = table.to_pandas(split_blocks=True)
+        if extra_path:
+            extra = pd.read_pickle(extra_path)
+            extra.index = df.index
+            df = pd.concat([df, extra], axis=1)[columns]
+        return df
+
+    def evict(self):
+        """Drop stale, expired and least recently used entries."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._locked():
+            return self._evict(self._read_manifest())
+
+    def _evict(self, manifest):
+        # Caller holds the manifest lock
+        now = time.time()
+        keep = {}
+        for key, entry in manifest.items():
+            try:
+                fresh = fingerprint(entry["source"]) == entry["fingerprint"]
+            except OSError:
+                fresh = False
+            if fresh and now - entry["last_used"] <= self.max_age_days * 86400:
+                keep[key] = entry
+        total = sum(e["bytes"] for e in keep.values())
+        for key, entry in sorted(keep.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["bytes"]
+            del keep[key]
+        for key in set(manifest) - set(keep):
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.evicted += 1
+        # Files left behind by a process that died between writing and registering them
+        known = {path for key in keep for path in self._paths(key)}
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith((".feather", ".pkl", ".tmp")) and path not in known:
+                try:
+                    if now - os.path.getmtime(path) > ORPHAN_AGE:
+                        os.remove(path)
+                except OSError:
+                    pass
+        self._write_manifest(keep)
+        return keep
+
+    def report(self):
+        manifest = self._read_manifest()
+        size = sum(e["bytes"] for e in manifest.values()) / 2 ** 20
+        state = "" if HAVE_ARROW else " (pyarrow not installed, cache disabled)"
+        print(f"Frame cache{state}: hits={self.hits}, misses={self.misses}, evicted={self.evicted}, "
+              f"entries={len(manifest)}, size={size:.1f} MiB")